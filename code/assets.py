@@ -0,0 +1,172 @@
+"""Contains the startup asset loader. Every image the game needs is decoded
+up front on a pool of worker threads, then converted to the display format
+on the main thread (pygame's display calls are not thread safe) and stored
+in support's caches, where the sprites find them already loaded. Animation
+sets are packed into texture atlases, loaded from the atlas cache when it
+is current.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os import path as os_path
+from time import perf_counter
+
+import pygame
+
+from settings import *
+from support import *
+from player import player_animations
+from enemy import enemy_animations
+from particles import particle_folders, leaf_folders
+from atlas import TextureAtlas, get_atlas_set, get_atlas_path, load_atlas_metadata
+
+
+def get_asset_folders():
+    """Return every folder of frames the game loads, without duplicates."""
+
+    folders = [f"../graphics/player/{animation}" for animation in player_animations]
+    folders += [
+        f"../graphics/monsters/{monster_name}/{animation}"
+        for monster_name in monster_data
+        for animation in enemy_animations
+    ]
+    folders += list(particle_folders.values()) + leaf_folders
+    folders += ["../graphics/grass", "../graphics/objects"]
+
+    return list(dict.fromkeys(folders))
+
+
+def get_asset_images():
+    """Return the (path, alpha) of every single image the game loads."""
+
+    images = [("../graphics/player/down_idle/idle_down.png", True)]
+    images += [(weapon["graphic"], True) for weapon in weapon_data.values()]
+    images += [
+        (f"../graphics/weapons/{weapon}/{direction}.png", True)
+        for weapon in weapon_data
+        for direction in ("up", "down", "left", "right")
+    ]
+    images += [(spell["graphic"], True) for spell in magic_data.values()]
+    images.append(("../graphics/tilemap/ground.png", False))
+
+    return images
+
+
+def decode_image(path):
+    """Decode an image file, returning it with the time it took. Touches no
+    display state, so it is safe to run on a worker thread.
+    """
+
+    start = perf_counter()
+    image = pygame.image.load(path)
+
+    return image, perf_counter() - start
+
+
+class LoadReport:
+    """How long loading took: in total, and per folder, decoding and
+    conversion included.
+    """
+
+    def __init__(self):
+        self.total = 0.0
+        self.image_count = 0
+        self.timings = {}   # folder -> seconds
+
+    def format(self):
+        """Return the report as text, slowest folders first."""
+
+        lines = [f"loaded {self.image_count} images in {self.total * 1000:.1f} ms"]
+        for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            lines.append(f"  {seconds * 1000:8.2f} ms  {name}")
+
+        return "\n".join(lines)
+
+
+def load_assets(progress=None, workers=ASSET_WORKERS):
+    """Load every image the game needs into support's caches, skipping the
+    ones already cached. progress(done, total) is called on the main thread
+    after each image is converted. Return a LoadReport.
+    """
+
+    start = perf_counter()
+    report = LoadReport()
+
+    folders = {folder: list_folder(folder) for folder in get_asset_folders() if folder not in folder_cache}
+    images = [(path, alpha) for path, alpha in get_asset_images() if path not in image_cache]
+
+    # the animation sets none of whose folders are loaded yet are packed
+    # into atlases. A set with a current cached atlas loads that instead of
+    # its frames.
+    atlas_sets = {}
+    if ATLAS_FRAMES:
+        for folder in get_asset_folders():
+            atlas_set = get_atlas_set(folder)
+            if atlas_set:
+                atlas_sets.setdefault(atlas_set, []).append(folder)
+    atlas_sets = {
+        atlas_set: set_folders for atlas_set, set_folders in atlas_sets.items()
+        if all(folder in folders for folder in set_folders)
+    }
+
+    cached_atlases = {}   # atlas set -> frame rects
+    for atlas_set, set_folders in atlas_sets.items():
+        frame_rects = load_atlas_metadata(atlas_set, set_folders)
+        if frame_rects is not None:
+            cached_atlases[atlas_set] = frame_rects
+            for folder in set_folders:
+                del folders[folder]
+
+    # (path, alpha, folder it is reported under)
+    jobs = [(path, True, folder) for folder, paths in folders.items() for path in paths]
+    jobs += [(path, alpha, os_path.dirname(path)) for path, alpha in images]
+    jobs += [(f"{get_atlas_path(atlas_set)}.png", True, atlas_set) for atlas_set in cached_atlases]
+
+    converted = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset-decoder") as executor:
+        futures = {executor.submit(decode_image, path): (path, alpha, name) for path, alpha, name in jobs}
+
+        for done, future in enumerate(as_completed(futures), 1):
+            path, alpha, name = futures[future]
+            image, decode_time = future.result()
+
+            convert_start = perf_counter()
+            converted[path] = image.convert_alpha() if alpha else image.convert()
+            convert_time = perf_counter() - convert_start
+
+            report.timings[name] = report.timings.get(name, 0.0) + decode_time + convert_time
+            if progress:
+                progress(done, len(jobs))
+
+    # frames finish in any order, so the folders are put back together in
+    # the order import_folder would have loaded them
+    for folder, paths in folders.items():
+        folder_cache[folder] = [converted[path] for path in paths]
+    for path, _ in images:
+        image_cache[path] = converted[path]
+
+    # swap the sets' frames for subsurfaces of their atlases, packing and
+    # caching the atlases that weren't cached
+    for atlas_set, set_folders in atlas_sets.items():
+        atlas_start = perf_counter()
+
+        if atlas_set in cached_atlases:
+            atlas = TextureAtlas(converted[f"{get_atlas_path(atlas_set)}.png"], cached_atlases[atlas_set])
+        else:
+            atlas = TextureAtlas.build({folder: folder_cache[folder] for folder in set_folders})
+            # the cache only saves time: if it can't be written, the atlas
+            # is used from memory and packed again next start
+            try:
+                atlas.save(atlas_set)
+            except (OSError, pygame.error):
+                pass
+
+        atlases[atlas_set] = atlas
+        for folder in set_folders:
+            folder_cache[folder] = atlas.get_frames(folder)
+
+        report.timings[atlas_set] = report.timings.get(atlas_set, 0.0) + perf_counter() - atlas_start
+
+    report.image_count = len(jobs)
+    report.total = perf_counter() - start
+
+    return report
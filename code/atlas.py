@@ -0,0 +1,160 @@
+"""Contains the texture atlases, which pack every frame of an animation set
+(the player, a monster, the particles) into one surface:
+
+TextureAtlas: a packed surface, with each frame as a source rect in it
+
+Built atlases are cached in ATLAS_CACHE as a png and a json of the frame
+rects, so later starts load one image per set instead of one per frame.
+"""
+
+import json
+from os import makedirs, remove, path as os_path
+
+import pygame
+
+from settings import *
+from support import list_folder
+
+
+ATLAS_VERSION = 1
+
+
+def get_atlas_sets():
+    """Return the root folder of every animation set packed into an atlas."""
+
+    atlas_sets = ["../graphics/player"]
+    atlas_sets += [f"../graphics/monsters/{monster_name}" for monster_name in monster_data]
+    atlas_sets.append("../graphics/particles")
+
+    return atlas_sets
+
+
+def get_atlas_set(folder):
+    """Return the root folder of the atlas a folder of frames is packed
+    into, or None if it isn't packed.
+    """
+
+    for atlas_set in get_atlas_sets():
+        if folder.startswith(f"{atlas_set}/"):
+            return atlas_set
+
+    return None
+
+
+def get_atlas_path(atlas_set):
+    """Return the cache path of an atlas set's files, without extension."""
+
+    return f"{ATLAS_CACHE}/{atlas_set.removeprefix('../graphics/').replace('/', '_')}"
+
+
+def pack_rects(sizes, max_width=ATLAS_MAX_WIDTH):
+    """Pack rects of the given sizes into shelves (rows as tall as their
+    tallest rect), tallest first. Return the packed size and the rects, in
+    the order of sizes.
+    """
+
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0], i))
+    rects = [None] * len(sizes)
+
+    x = y = shelf_height = width = 0
+    for i in order:
+        rect_width, rect_height = sizes[i]
+
+        # start a new shelf when this one is full
+        if x + rect_width > max_width and x > 0:
+            y += shelf_height
+            x = shelf_height = 0
+
+        rects[i] = pygame.Rect(x, y, rect_width, rect_height)
+        x += rect_width
+        shelf_height = max(shelf_height, rect_height)
+        width = max(width, x)
+
+    return (width, y + shelf_height), rects
+
+
+class TextureAtlas:
+    """The frames of several folders packed into one surface. Each frame is
+    a rect of the atlas surface, handed out as a subsurface (sharing the
+    atlas pixels) or as the rect itself, for blits with a source area.
+    """
+
+    def __init__(self, surface, frame_rects):
+        self.surface = surface
+        self.frame_rects = frame_rects   # folder -> list of rects, one per frame
+
+    @classmethod
+    def build(cls, folder_frames):
+        """Pack the frames of every folder in folder_frames (folder -> list
+        of frames) into a new atlas.
+        """
+
+        frames = [frame for folder in folder_frames.values() for frame in folder]
+        size, rects = pack_rects([frame.get_size() for frame in frames])
+
+        surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        surface.fill((0, 0, 0, 0))
+        # taking the max over a cleared surface copies the frame's pixels,
+        # alpha included, where a normal blit would blend them
+        surface.blits([(frame, rect, None, pygame.BLEND_RGBA_MAX) for frame, rect in zip(frames, rects)], False)
+
+        packed_rects = iter(rects)
+        frame_rects = {folder: [next(packed_rects) for _ in frames] for folder, frames in folder_frames.items()}
+
+        return cls(surface, frame_rects)
+
+    def get_frames(self, folder):
+        """Return a folder's frames as subsurfaces of the atlas."""
+
+        return [self.surface.subsurface(rect) for rect in self.frame_rects[folder]]
+
+    def save(self, atlas_set):
+        """Write the atlas to the cache. The png is written first, so a
+        save that fails partway never leaves metadata pointing at a missing
+        or half-written png.
+        """
+
+        path = get_atlas_path(atlas_set)
+        makedirs(os_path.dirname(path), exist_ok=True)
+
+        # drop the old metadata until the new png is complete
+        if os_path.exists(f"{path}.json"):
+            remove(f"{path}.json")
+        pygame.image.save(self.surface, f"{path}.png")
+
+        # the frame files are recorded so a cached atlas isn't used for a
+        # folder whose files changed or are listed in another order
+        metadata = {
+            "version": ATLAS_VERSION,
+            "files": {folder: list_folder(folder) for folder in self.frame_rects},
+            "frames": {folder: [list(rect) for rect in rects] for folder, rects in self.frame_rects.items()},
+        }
+        with open(f"{path}.json", "w") as metadata_file:
+            json.dump(metadata, metadata_file)
+
+
+def load_atlas_metadata(atlas_set, folders):
+    """Return the frame rects of an atlas set's cached atlas (folder -> list
+    of rects), or None if there is no cached atlas of exactly these folders
+    newer than all of their frames.
+    """
+
+    path = get_atlas_path(atlas_set)
+    if not (os_path.exists(f"{path}.png") and os_path.exists(f"{path}.json")):
+        return None
+
+    with open(f"{path}.json") as metadata_file:
+        metadata = json.load(metadata_file)
+
+    if metadata["version"] != ATLAS_VERSION or sorted(metadata["files"]) != sorted(folders):
+        return None
+
+    atlas_time = min(os_path.getmtime(f"{path}.png"), os_path.getmtime(f"{path}.json"))
+    for folder in folders:
+        frame_paths = list_folder(folder)
+        if frame_paths != metadata["files"][folder]:
+            return None
+        if any(os_path.getmtime(frame_path) > atlas_time for frame_path in frame_paths):
+            return None
+
+    return {folder: [pygame.Rect(rect) for rect in metadata["frames"][folder]] for folder in folders}
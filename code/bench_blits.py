@@ -0,0 +1,106 @@
+"""Micro-benchmark comparing per-sprite blitting (as the camera used to do)
+with building one (surface, position) sequence and submitting it in a single
+Surface.blits / Surface.fblits call. Run it from the code directory:
+
+    python bench_blits.py
+
+Set SDL_VIDEODRIVER=dummy to run it without opening a window.
+"""
+
+import random
+from time import perf_counter
+
+import pygame
+
+from settings import *
+from support import import_folder
+
+
+SPRITE_COUNTS = (100, 300, 1000, 3000)
+FRAMES = 200
+
+
+class FakeSprite:
+    """Just enough of a sprite to be drawn: an image and a rect."""
+
+    def __init__(self, image, pos):
+        self.image = image
+        self.rect = image.get_rect(topleft=pos)
+
+
+def create_sprites(count, images):
+    """Scatter sprites with map images over a screen-sized area."""
+
+    rng = random.Random(count)
+
+    return [
+        FakeSprite(rng.choice(images), (rng.randrange(0, WIDTH), rng.randrange(0, HEIGHT)))
+        for _ in range(count)
+    ]
+
+
+def draw_per_sprite(surface, sprites, offset):
+    """One blit per sprite, with a Vector2 subtraction for each position."""
+
+    for sprite in sprites:
+        offset_pos = sprite.rect.topleft - offset
+        surface.blit(sprite.image, offset_pos)
+
+
+def draw_batched(surface, sprites, offset, blit_sequence):
+    """Queue every sprite with integer positions and submit them at once."""
+
+    offset_x = int(offset.x)
+    offset_y = int(offset.y)
+
+    blit_sequence.clear()
+    blit_sequence.extend(
+        (sprite.image, (sprite.rect.x - offset_x, sprite.rect.y - offset_y))
+        for sprite in sprites
+    )
+
+    if hasattr(surface, "fblits"):
+        surface.fblits(blit_sequence)
+    else:
+        surface.blits(blit_sequence, False)
+
+
+def time_frames(draw):
+    """Return the mean time of a draw call in milliseconds."""
+
+    start = perf_counter()
+    for _ in range(FRAMES):
+        draw()
+
+    return (perf_counter() - start) / FRAMES * 1000
+
+
+def main():
+    """Run the benchmark at each sprite count and print a table."""
+
+    pygame.init()
+    surface = pygame.display.set_mode((WIDTH, HEIGHT))
+
+    images = [img.convert_alpha() for img in import_folder("../graphics/grass")]
+    images += [img.convert_alpha() for img in import_folder("../graphics/objects")]
+
+    offset = pygame.math.Vector2(10, 10)
+    blit_sequence = []
+
+    submit = "fblits" if hasattr(surface, "fblits") else "blits"
+    print(f"{'sprites':>8} {'per-sprite ms':>14} {submit + ' ms':>10} {'speedup':>8}")
+
+    for count in SPRITE_COUNTS:
+        sprites = create_sprites(count, images)
+
+        per_sprite = time_frames(lambda: draw_per_sprite(surface, sprites, offset))
+        batched = time_frames(lambda: draw_batched(surface, sprites, offset, blit_sequence))
+
+        print(f"{count:>8} {per_sprite:>14.3f} {batched:>10.3f} {per_sprite / batched:>7.2f}x")
+
+    pygame.quit()
+
+
+# !---------------------------------------------------------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Frame-time benchmark suite. Drives a Level through reproducible scripted
+scenarios with no window or audio, and reports the p50/p95/p99 time of each
+phase of a frame. Run it from the code directory:
+
+    python benchmark.py [output.json] [scenario ...]
+
+Results are written as JSON (benchmark.json by default), so the runs of two
+commits can be compared to catch regressions.
+"""
+
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+from time import perf_counter
+
+# sets up SDL's dummy drivers, so it has to come before pygame is used
+from headless import create_headless_level, HeadlessRunner, InputScript
+
+import pygame
+
+from settings import *
+import game_clock
+import game_random
+from profiler import profiler
+
+
+SEED = 0
+WARMUP_FRAMES = 30   # frames run before timing starts, not included in results
+SWARM_SIZE = 50
+
+# phase name -> what it times. The frame is timed here, every other phase by
+# the in-game profiler.
+PHASES = {
+    "frame": "a whole frame: update, draw and display update",
+    "sprite_update": "sprite updates (visible_sprites.update)",
+    "enemy_ai": "enemy AI (Level.update_enemies)",
+    "attack_logic": "attack collisions (Level.run_attack_logic)",
+    "custom_draw": "world drawing (YSortCameraGroup.custom_draw)",
+    "hud": "HUD and upgrade menu drawing",
+    "display_update": "pygame.display.update",
+}
+
+
+def find_open_tiles(level, center, min_distance, max_distance):
+    """Return the top-left of every tile between min_distance and
+    max_distance of center that no obstacle overlaps, nearest first.
+    """
+
+    center = pygame.math.Vector2(center)
+    reach = max_distance // TILESIZE + 1
+    center_col = int(center.x) // TILESIZE
+    center_row = int(center.y) // TILESIZE
+
+    tiles = []
+    for row in range(center_row - reach, center_row + reach + 1):
+        for col in range(center_col - reach, center_col + reach + 1):
+            rect = pygame.Rect(col * TILESIZE, row * TILESIZE, TILESIZE, TILESIZE)
+            distance = center.distance_to(rect.center)
+            if not min_distance <= distance <= max_distance:
+                continue
+            if any(sprite.rect.colliderect(rect) for sprite in level.obstacle_sprites.query(rect)):
+                continue
+            tiles.append((distance, rect.topleft))
+
+    tiles.sort()
+
+    return [pos for _, pos in tiles]
+
+
+def move_player(level, pos):
+    """Put the player's hitbox at the top-left of a tile."""
+
+    player = level.player
+    player.hitbox.topleft = pos
+    player.rect.center = player.hitbox.center
+
+
+def setup_town(level):
+    """Leave the player where the map starts them."""
+
+    pass
+
+
+def setup_swarm(level):
+    """Surround the player with SWARM_SIZE enemies."""
+
+    rng = random.Random(SEED)
+    names = list(monster_data.keys())
+
+    tiles = find_open_tiles(level, level.player.rect.center, TILESIZE * 3, TILESIZE * 12)
+    for index, pos in enumerate(rng.sample(tiles, SWARM_SIZE)):
+        level.create_enemy(names[index % len(names)], pos)
+
+
+def setup_grass(level):
+    """Move the player to the open tile with the most grass around it."""
+
+    grass = [sprite for sprite in level.attackable_sprites if sprite.sprite_type == "grass"]
+    if not grass:
+        return
+
+    def count_grass(pos):
+        area = pygame.Rect(pos, (TILESIZE, TILESIZE)).inflate(TILESIZE * 6, TILESIZE * 6)
+        return sum(sprite.sprite_type == "grass" for sprite in level.obstacle_sprites.query(area))
+
+    tiles = {}
+    for sprite in grass:
+        for pos in find_open_tiles(level, sprite.rect.center, 0, TILESIZE * 2):
+            tiles[pos] = None
+
+    move_player(level, max(tiles, key=count_grass))
+
+
+def setup_menu(level):
+    """Open the upgrade menu."""
+
+    level.toggle_menu()
+
+
+# scenario name -> (setup, input script of (steps, keys) segments)
+SCENARIOS = {
+    "idle_town": (setup_town, [(600, [])]),
+    "walk_map": (setup_town, [
+        (240, [pygame.K_RIGHT]),
+        (180, [pygame.K_DOWN]),
+        (240, [pygame.K_RIGHT]),
+        (180, [pygame.K_UP]),
+        (240, [pygame.K_LEFT]),
+    ]),
+    "enemy_swarm": (setup_swarm, [
+        (150, [pygame.K_SPACE]),
+        (60, [pygame.K_LEFT]),
+        (150, [pygame.K_LCTRL]),
+        (60, [pygame.K_RIGHT]),
+        (150, [pygame.K_SPACE]),
+    ]),
+    "grass_cutting": (setup_grass, [
+        (60, [pygame.K_SPACE, pygame.K_RIGHT]),
+        (60, [pygame.K_LCTRL, pygame.K_DOWN]),
+        (60, [pygame.K_SPACE, pygame.K_LEFT]),
+        (60, [pygame.K_LCTRL, pygame.K_UP]),
+    ] * 3),
+    "upgrade_menu": (setup_menu, [
+        (60, [pygame.K_RIGHT]),
+        (60, [pygame.K_SPACE]),
+        (60, [pygame.K_LEFT]),
+        (60, []),
+    ] * 3),
+}
+
+
+def percentile(sorted_samples, percent):
+    """Return the nearest-rank percentile of a sorted list of samples."""
+
+    index = max(0, math.ceil(percent / 100 * len(sorted_samples)) - 1)
+
+    return sorted_samples[index]
+
+
+def summarize(samples):
+    """Return the mean, p50, p95, p99 and max of some samples, in ms."""
+
+    ordered = sorted(samples)
+
+    return {
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "p50": round(percentile(ordered, 50), 4),
+        "p95": round(percentile(ordered, 95), 4),
+        "p99": round(percentile(ordered, 99), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def run_scenario(name):
+    """Run one scenario on a fresh level and return its results."""
+
+    setup, segments = SCENARIOS[name]
+
+    game_random.reseed(SEED)
+    game_clock.ticks = 0.0
+
+    level = create_headless_level()
+    screen = pygame.display.get_surface()
+    setup(level)
+
+    runner = HeadlessRunner(level, InputScript(segments))
+    samples = {phase: [] for phase in PHASES}
+
+    # nothing is half-timed between scenarios, so the profiler can be
+    # switched on directly rather than through toggle()
+    was_enabled = profiler.enabled
+    profiler.enabled = True
+
+    try:
+        for frame, key_state in enumerate(runner.script):
+            start = perf_counter()
+
+            runner.step(key_state)
+            screen.fill(WATER_COLOR)
+            level.draw()
+            profiler.start("display_update")
+            pygame.display.update()
+            profiler.stop("display_update")
+
+            frame_time = (perf_counter() - start) * 1000
+            profiler.end_frame(frame_time)
+
+            if frame >= WARMUP_FRAMES:
+                samples["frame"].append(frame_time)
+                for phase in PHASES:
+                    if phase != "frame":
+                        samples[phase].append(profiler.phase_times[phase].latest())
+    finally:
+        profiler.enabled = was_enabled
+        level.shutdown()
+
+    return {
+        "frames": len(samples["frame"]),
+        "phases": {phase: summarize(phase_samples) for phase, phase_samples in samples.items()},
+    }
+
+
+def get_commit():
+    """Return the commit being benchmarked, if run from a git checkout."""
+
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return None
+
+    return result.stdout.strip() or None
+
+
+def main(out_path, names):
+    """Run the named scenarios, print a table and write the JSON results."""
+
+    results = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "settings": {
+            "BAKE_STATIC_LAYER": BAKE_STATIC_LAYER,
+            "BATCHED_ENEMY_AI": BATCHED_ENEMY_AI,
+            "REUSE_WEAPON_SPRITE": REUSE_WEAPON_SPRITE,
+            "ENEMY_ACTIVATION_RADIUS": ENEMY_ACTIVATION_RADIUS,
+        },
+        "phases": PHASES,
+        "scenarios": {},
+    }
+
+    print(f"{'scenario':<14} {'phase':<17} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+
+    for name in names:
+        scenario = run_scenario(name)
+        results["scenarios"][name] = scenario
+
+        for phase, stats in scenario["phases"].items():
+            print(f"{name:<14} {phase:<17} {stats['p50']:>8.3f} {stats['p95']:>8.3f} {stats['p99']:>8.3f}")
+
+    with open(out_path, "w") as out_file:
+        json.dump(results, out_file, indent=2)
+
+    print(f"results written to {out_path}")
+
+
+# !---------------------------------------------------------------------------
+if __name__ == "__main__":
+    out_path = sys.argv[1] if len(sys.argv) > 1 else "benchmark.json"
+    names = sys.argv[2:] or list(SCENARIOS)
+
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        sys.exit(f"unknown scenario(s): {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+
+    main(out_path, names)
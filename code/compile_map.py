@@ -0,0 +1,71 @@
+"""One-off converter from the map csvs to the compiled binary map format read
+by support.import_compiled_map. Run it from the code directory:
+
+    python compile_map.py
+"""
+
+import sys
+from array import array
+
+from settings import *
+from support import *
+
+
+def compile_map(layers, out_path):
+    """Write the csv layers ({name: csv path}) into a single compiled map."""
+
+    layouts = {name: import_csv_layout(csv_path) for name, csv_path in layers.items()}
+
+    height = max(len(layout) for layout in layouts.values())
+    width = max(len(row) for layout in layouts.values() for row in layout)
+
+    # dense value arrays plus the indices of their non-empty cells
+    compiled = {}
+    for name, layout in layouts.items():
+        values = array("h", [-1]) * (width * height)
+        cells = array("i")
+
+        for row_i, row in enumerate(layout):
+            for col_i, col in enumerate(row):
+                if col != "-1":
+                    index = row_i * width + col_i
+                    values[index] = int(col)
+                    cells.append(index)
+
+        if sys.byteorder != "little":
+            values.byteswap()
+            cells.byteswap()
+
+        compiled[name] = (values, cells)
+
+    # lay out the file: header, layer table, then each layer's arrays
+    offset = MAP_HEADER.size + MAP_LAYER_ENTRY.size * len(compiled)
+    entries = []
+    for name, (values, cells) in compiled.items():
+        values_offset = offset
+        cells_offset = values_offset + len(values) * 2
+        cells_offset += -cells_offset % 4
+        offset = cells_offset + len(cells) * 4
+
+        entries.append((name, values_offset, cells_offset))
+
+    with open(out_path, "wb") as map_file:
+        map_file.write(MAP_HEADER.pack(MAP_MAGIC, MAP_VERSION, width, height, len(compiled)))
+
+        for name, values_offset, cells_offset in entries:
+            cell_count = len(compiled[name][1])
+            map_file.write(MAP_LAYER_ENTRY.pack(name.encode(), values_offset, cells_offset, cell_count))
+
+        for name, values_offset, cells_offset in entries:
+            values, cells = compiled[name]
+
+            map_file.seek(values_offset)
+            map_file.write(values.tobytes())
+            map_file.seek(cells_offset)
+            map_file.write(cells.tobytes())
+
+
+# !---------------------------------------------------------------------------
+if __name__ == "__main__":
+    compile_map(map_layers, COMPILED_MAP)
+    print(f"wrote {COMPILED_MAP}")
@@ -0,0 +1,35 @@
+"""Contains the key state the game logic reads its input from. It is pygame's
+keyboard by default; scripted runs and replays can swap in their own source.
+"""
+
+import pygame
+
+
+class KeyState:
+    """A set of held keys, indexable like pygame.key.get_pressed()."""
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+# a callable returning the pressed keys, or None for pygame's keyboard
+source = None
+
+
+def get_pressed():
+    """Return the current key state, indexable by pygame key constants."""
+
+    if source is None:
+        return pygame.key.get_pressed()
+
+    return source()
+
+
+def set_source(new_source):
+    """Read input from new_source from now on (None restores the keyboard)."""
+
+    global source
+    source = new_source
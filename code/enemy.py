@@ -6,6 +6,12 @@ import pygame
 from settings import *
 from support import *
 from entity import Entity
+from sounds import sound_bank
+import game_clock
+
+
+# every monster's animations, each a folder in graphics/monsters/<name>
+enemy_animations = ("idle", "move", "attack")
 
 
 class Enemy(Entity):
@@ -17,6 +23,9 @@ class Enemy(Entity):
         # general setup
         self.sprite_type = "enemy"
 
+        # enemies sleep until the player comes within activation range
+        self.dormant = True
+
         # graphics setup
         self.import_graphics(monster_name)
         self.status = "idle"
@@ -54,21 +63,22 @@ class Enemy(Entity):
         self.invincibility_duration = 300
 
         # sounds
-        self.death_sound = pygame.mixer.Sound("../audio/death.wav")
-        self.hit_sound = pygame.mixer.Sound("../audio/hit.wav")
-        self.attack_sound = pygame.mixer.Sound(monster_info["attack_sound"])
-        self.death_sound.set_volume(0.3)
-        self.hit_sound.set_volume(0.3)
-        self.attack_sound.set_volume(0.3)
+        self.death_sound = sound_bank.get("death")
+        self.hit_sound = sound_bank.get("hit")
+        self.attack_sound = sound_bank.get(monster_info["attack_sound"])
 
     def import_graphics(self, name):
-        """Import the graphics for an enemy."""
+        """Import the graphics for an enemy, shared with every enemy of the
+        same kind.
+        """
 
-        self.animations = {"idle": [], "move": [], "attack": []}
+        self.animations = {}
+        self.flash_animations = {}
 
         main_path = f"../graphics/monsters/{name}"
-        for animation in self.animations.keys():
-            self.animations[animation] = import_folder(f"{main_path}/{animation}")
+        for animation in enemy_animations:
+            self.animations[animation] = import_folder_cached(f"{main_path}/{animation}")
+            self.flash_animations[animation] = import_flash_frames_cached(f"{main_path}/{animation}")
 
     def get_player_distance_direction(self, player):
         """Return the distance from the player and the direction towards them."""
@@ -103,7 +113,7 @@ class Enemy(Entity):
         """Perform an action depending on the current status."""
 
         if self.status == "attack":
-            self.attack_time = pygame.time.get_ticks()
+            self.attack_time = game_clock.get_ticks()
             self.damage_player(self.damage, self.attack_type)
             self.attack_sound.play()
         elif self.status == "move":
@@ -122,21 +132,17 @@ class Enemy(Entity):
                 self.can_attack = False
             self.frame_index = 0
 
+        # logic for flickering image when hit: switch to the faded out frames
+        if not self.vulnerable and not self.wave_value():
+            animation = self.flash_animations[self.status]
+
         self.image = animation[int(self.frame_index)]
         self.rect = self.image.get_rect(center=self.hitbox.center)
 
-        # logic for flickering image when hit
-        if not self.vulnerable:
-            alpha = self.wave_value()
-
-            self.image.set_alpha(alpha)
-        else:
-            self.image.set_alpha(255)
-
     def cooldowns(self):
         """Manage enemy cooldowns with a custom timer."""
 
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
 
         if not self.can_attack:
 
@@ -163,7 +169,7 @@ class Enemy(Entity):
         else: # magic damage
             self.health -= player.get_full_spell_dmg()
 
-        self.hit_time = pygame.time.get_ticks()
+        self.hit_time = game_clock.get_ticks()
         self.vulnerable = False
 
     def check_death(self):
@@ -184,6 +190,9 @@ class Enemy(Entity):
     def update(self):
         """Update the sprite on the screen."""
 
+        if self.dormant:
+            return
+
         self.move(self.speed)
         self.animate()
 
@@ -0,0 +1,182 @@
+"""Contains a batched version of the enemy AI, which runs every enemy's
+enemy_update() logic at once with NumPy.
+"""
+
+import game_clock
+
+try:
+    import numpy as np
+except ImportError: # numpy is only needed for the batched AI
+    np = None
+
+
+# enemy.status <-> status code
+STATUSES = ("idle", "move", "attack")
+IDLE, MOVE, ATTACK = range(len(STATUSES))
+
+
+class EnemyTable:
+    """A structure-of-arrays copy of the enemies' AI state.
+
+    Fixed stats are written once when an enemy is added. Positions, health
+    and the flags changed outside the AI (a hit, the end of an attack
+    animation) are refreshed from the sprites at the start of each update;
+    everything else is computed here and written back.
+    """
+
+    def __init__(self, capacity=64):
+        self.enemies = []
+        self.rows = {}
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        """Create (or grow) the arrays to hold the given number of enemies."""
+
+        old = getattr(self, "arrays", None)
+
+        self.arrays = {
+            "pos": np.zeros((capacity, 2)),
+            "health": np.zeros(capacity),
+            "attack_radius": np.zeros(capacity),
+            "notice_radius": np.zeros(capacity),
+            "resistance": np.zeros(capacity),
+            "attack_cooldown": np.zeros(capacity),
+            "invincibility_duration": np.zeros(capacity),
+            "attack_time": np.zeros(capacity),
+            "hit_time": np.zeros(capacity),
+            "can_attack": np.ones(capacity, dtype=bool),
+            "vulnerable": np.ones(capacity, dtype=bool),
+            "status": np.zeros(capacity, dtype=np.int8),
+        }
+
+        if old is not None:
+            count = len(self.enemies)
+            for name, values in old.items():
+                self.arrays[name][:count] = values[:count]
+
+    def add(self, enemy):
+        """Register an enemy and copy its fixed stats into the table."""
+
+        row = len(self.enemies)
+        if row == len(self.arrays["status"]):
+            self.allocate(row * 2)
+
+        self.enemies.append(enemy)
+        self.rows[enemy] = row
+
+        arrays = self.arrays
+        arrays["attack_radius"][row] = enemy.attack_radius
+        arrays["notice_radius"][row] = enemy.notice_radius
+        arrays["resistance"][row] = enemy.resistance
+        arrays["attack_cooldown"][row] = enemy.attack_cooldown
+        arrays["invincibility_duration"][row] = enemy.invincibility_duration
+        arrays["attack_time"][row] = 0
+        arrays["status"][row] = STATUSES.index(enemy.status)
+
+    def remove_dead(self):
+        """Drop the rows of enemies that have been killed."""
+
+        alive = [row for row, enemy in enumerate(self.enemies) if enemy.alive()]
+        if len(alive) == len(self.enemies):
+            return
+
+        for values in self.arrays.values():
+            values[:len(alive)] = values[alive]
+
+        self.enemies = [self.enemies[row] for row in alive]
+        self.rows = {enemy: row for row, enemy in enumerate(self.enemies)}
+
+    def sync(self, enemies, rows):
+        """Refresh the values that change outside of the AI pass."""
+
+        arrays = self.arrays
+
+        state = [
+            (*enemy.rect.center, enemy.health, enemy.can_attack, enemy.vulnerable, enemy.hit_time or 0)
+            for enemy in enemies
+        ]
+        state = np.array(state, dtype=float).reshape(len(enemies), 6)
+
+        arrays["pos"][rows] = state[:, :2]
+        arrays["health"][rows] = state[:, 2]
+        arrays["can_attack"][rows] = state[:, 3] != 0
+        arrays["vulnerable"][rows] = state[:, 4] != 0
+        arrays["hit_time"][rows] = state[:, 5]
+
+    def update(self, player, enemies=None):
+        """Run set_status, perform_action, cooldowns, hit_reaction and
+        check_death for the given enemies (every enemy by default) at once.
+        """
+
+        self.remove_dead()
+
+        if enemies is None:
+            enemies = self.enemies
+        else:
+            enemies = [enemy for enemy in enemies if enemy in self.rows]
+        if not enemies:
+            return
+
+        rows = np.array([self.rows[enemy] for enemy in enemies])
+        self.sync(enemies, rows)
+
+        a = {name: values[rows] for name, values in self.arrays.items()}
+        current_time = game_clock.get_ticks()
+
+        # distances and directions to the player
+        delta = np.array(player.rect.center, dtype=float) - a["pos"]
+        distance = np.hypot(delta[:, 0], delta[:, 1])
+        safe_distance = np.where(distance > 0, distance, 1)
+        direction = delta / safe_distance[:, None]
+        direction[distance == 0] = 0
+
+        # set_status
+        attacking = (distance <= a["attack_radius"]) & a["can_attack"]
+        moving = ~attacking & (distance <= a["notice_radius"])
+        new_status = np.where(attacking, ATTACK, np.where(moving, MOVE, IDLE))
+        started_attack = attacking & (a["status"] != ATTACK)
+
+        # perform_action (idle enemies stand still, attackers keep their direction)
+        a["attack_time"][attacking] = current_time
+        direction[~moving] = 0
+
+        # cooldowns
+        can_attack = a["can_attack"] | (current_time - a["attack_time"] >= a["attack_cooldown"])
+        vulnerable = a["vulnerable"] | (current_time - a["hit_time"] >= a["invincibility_duration"])
+
+        # hit_reaction
+        knockback = np.where(vulnerable, 1.0, -a["resistance"])
+        direction *= knockback[:, None]
+
+        # store the new state in the table
+        self.arrays["status"][rows] = new_status
+        self.arrays["attack_time"][rows] = a["attack_time"]
+        self.arrays["can_attack"][rows] = can_attack
+        self.arrays["vulnerable"][rows] = vulnerable
+
+        # and write it back to the sprites
+        results = zip(
+            enemies, new_status.tolist(), started_attack.tolist(),
+            direction.tolist(), knockback.tolist(),
+            can_attack.tolist(), vulnerable.tolist(),
+        )
+        for enemy, status, started, (dir_x, dir_y), knock, can_attack, vulnerable in results:
+            enemy.status = STATUSES[status]
+            enemy.can_attack = can_attack
+            enemy.vulnerable = vulnerable
+
+            if started:
+                enemy.frame_index = 0
+
+            if status == ATTACK:
+                enemy.attack_time = current_time
+                enemy.damage_player(enemy.damage, enemy.attack_type)
+                enemy.attack_sound.play()
+                if knock != 1.0:
+                    enemy.direction *= knock
+            else:
+                enemy.direction.update(dir_x, dir_y)
+
+        # check_death
+        for index in np.flatnonzero(a["health"] <= 0).tolist():
+            enemies[index].check_death()
@@ -6,6 +6,8 @@ from math import sin
 
 import pygame
 
+import game_clock
+
 
 class Entity(pygame.sprite.Sprite):
     """A being in the game world."""
@@ -25,8 +27,11 @@ class Entity(pygame.sprite.Sprite):
         the entity position.
         """
 
+        # only test obstacles sharing a grid cell with the hitbox
+        obstacles = self.obstacle_sprites.query(self.hitbox)
+
         if direction == "horizontal":
-            for sprite in self.obstacle_sprites:
+            for sprite in obstacles:
                 if sprite.hitbox.colliderect(self.hitbox):
                     if self.direction.x > 0: # moving right
                         self.hitbox.right = sprite.hitbox.left
@@ -34,7 +39,7 @@ class Entity(pygame.sprite.Sprite):
                         self.hitbox.left = sprite.hitbox.right
 
         if direction == "vertical":
-            for sprite in self.obstacle_sprites:
+            for sprite in obstacles:
                 if sprite.hitbox.colliderect(self.hitbox):
                     if self.direction.y > 0: # moving down
                         self.hitbox.bottom = sprite.hitbox.top
@@ -60,4 +65,4 @@ class Entity(pygame.sprite.Sprite):
     def wave_value(self):
         """Use a sign wave to toggle between 255 and 0."""
 
-        return 255 if sin(pygame.time.get_ticks()) >= 0 else 0
+        return 255 if sin(game_clock.get_ticks()) >= 0 else 0
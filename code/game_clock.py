@@ -0,0 +1,26 @@
+"""Contains the simulation clock. Game logic reads the time from here instead
+of pygame.time.get_ticks(), so timers advance with simulation steps rather
+than with wall time.
+"""
+
+from settings import *
+
+
+# simulation time in milliseconds
+ticks = 0.0
+
+# the length of one simulation step in milliseconds
+STEP_MS = 1000 / TICK_RATE
+
+
+def get_ticks():
+    """Return the simulation time in milliseconds."""
+
+    return ticks
+
+
+def advance(ms=STEP_MS):
+    """Move the simulation time forward, by one step by default."""
+
+    global ticks
+    ticks += ms
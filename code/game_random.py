@@ -0,0 +1,24 @@
+"""Contains the random number generator every random choice in the game logic
+draws from. With one seeded generator, a session can be replayed exactly from
+its seed and its input (see replay.py).
+"""
+
+import random
+
+
+# the seed rng was last seeded with
+seed = None
+rng = random.Random()
+
+
+def reseed(new_seed=None):
+    """Seed rng, with a fresh random seed if none is given. Return the seed."""
+
+    global seed
+    if new_seed is None:
+        new_seed = random.randrange(2 ** 32)
+
+    seed = new_seed
+    rng.seed(seed)
+
+    return seed
@@ -0,0 +1,128 @@
+"""Runs the level's game logic with no window, no audio and no drawing, as
+fast as possible, driven by scripted input. Used for load tests, batch
+simulations and benchmarks on machines without a display or sound card.
+Run it from the code directory:
+
+    python headless.py [steps]
+"""
+
+import os
+import sys
+from time import perf_counter
+
+# use SDL's dummy drivers, so no window or audio device is ever opened
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from settings import *
+from level import Level
+from sounds import sound_bank
+import controls
+from controls import KeyState
+import game_clock
+
+
+class InputScript:
+    """Scripted input: a list of (steps, keys) segments, each holding its keys
+    down for that many simulation steps.
+    """
+
+    def __init__(self, segments):
+        self.segments = [(steps, KeyState(keys)) for steps, keys in segments]
+
+    def __len__(self):
+        return sum(steps for steps, _ in self.segments)
+
+    def __iter__(self):
+        for steps, key_state in self.segments:
+            for _ in range(steps):
+                yield key_state
+
+
+def create_headless_level():
+    """Set up pygame without a window or audio, and create a Level."""
+
+    pygame.init()
+
+    # images still need a display format to convert to; with the dummy
+    # driver this surface is never shown
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    sound_bank.disable()
+
+    level = Level()
+
+    # headless runs step as fast as they can, leaving the chunk decoder
+    # little time, and should run the same every time
+    if level.streamer:
+        level.streamer.deterministic = True
+
+    return level
+
+
+class HeadlessRunner:
+    """Steps a Level with scripted input and never draws it."""
+
+    def __init__(self, level, script):
+        self.level = level
+        self.script = script
+        self.key_state = KeyState()
+
+        controls.set_source(lambda: self.key_state)
+
+    def step(self, key_state):
+        """Run one simulation step with the given keys held."""
+
+        # pressing m toggles the upgrade menu, like the KEYDOWN event in main
+        if key_state[pygame.K_m] and not self.key_state[pygame.K_m]:
+            self.level.toggle_menu()
+
+        self.key_state = key_state
+        self.level.update()
+        game_clock.advance()
+
+    def run(self, steps=None):
+        """Run the script (or its first steps) and return the steps run."""
+
+        count = 0
+        for key_state in self.script:
+            if steps is not None and count >= steps:
+                break
+            self.step(key_state)
+            count += 1
+
+        return count
+
+
+# a short tour: walk around, swing weapons, cast spells and open the menu
+DEMO_SCRIPT = [
+    (120, [pygame.K_RIGHT]),
+    (30, [pygame.K_SPACE]),
+    (120, [pygame.K_DOWN]),
+    (30, [pygame.K_LCTRL]),
+    (10, [pygame.K_e]),
+    (30, [pygame.K_LCTRL]),
+    (120, [pygame.K_LEFT]),
+    (10, [pygame.K_q]),
+    (30, [pygame.K_SPACE]),
+    (1, [pygame.K_m]),
+    (60, [pygame.K_RIGHT]),
+    (1, [pygame.K_m]),
+    (120, [pygame.K_UP]),
+]
+
+
+# !---------------------------------------------------------------------------
+if __name__ == "__main__":
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    level = create_headless_level()
+    runner = HeadlessRunner(level, InputScript(DEMO_SCRIPT))
+
+    start = perf_counter()
+    count = runner.run(steps)
+    elapsed = perf_counter() - start
+    level.shutdown()
+
+    print(f"{count} steps in {elapsed:.3f}s ({count / elapsed:.0f} steps/s)")
@@ -4,7 +4,8 @@ Level: A level in the game, including all sprites and logic to run the level
 YSortCameraGroup: A sprite group with custom functions for a better camera
 """
 
-import random
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
 
 import pygame
 
@@ -13,11 +14,18 @@ from support import *
 from tile import Tile
 from player import Player
 from enemy import Enemy
-from weapon import Weapon
+from weapon import Weapon, load_weapon_graphics
 from ui import UI
 from particles import AnimationPlayer
 from magic import MagicPlayer
 from upgrade import UpgradeMenu
+from spatial_hash import SpatialHashGroup
+from sounds import sound_bank
+from enemy_ai import EnemyTable, np
+from streaming import MapSource, WorldStreamer
+import game_clock
+from game_random import rng
+from profiler import profiler
 
 class Level:
     """A level in the game."""
@@ -26,89 +34,147 @@ class Level:
         # get display surface
         self.display_surface = pygame.display.get_surface()
 
+        # decode every sound up front, before entities start referencing them
+        sound_bank.load()
+
+        # particles
+        self.animation_player = AnimationPlayer()
+        self.magic_player = MagicPlayer(self.animation_player)
+
         # sprite group setup
-        self.visible_sprites = YSortCameraGroup()
-        self.obstacle_sprites = pygame.sprite.Group()
+        self.visible_sprites = YSortCameraGroup(self.animation_player.particles)
+        self.obstacle_sprites = SpatialHashGroup()
+
+        # enemies, indexed by position so the ones near the player can be woken
+        self.enemy_sprites = SpatialHashGroup(cell_size=CHUNK_SIZE)
+        self.active_enemies = []
 
-        # attack sprites
+        # attack sprites (the weapons in use; flames are attack particles)
         self.current_attack = None
+        self.weapon_sprite = None
         self.attack_sprites = pygame.sprite.Group()
         self.attackable_sprites = pygame.sprite.Group()
+        # attackable tiles (grass) never move, so they are indexed by rect and
+        # attacks only test the ones near them. Enemies are found through
+        # enemy_sprites.
+        self.attackable_tiles = SpatialHashGroup(rect_attr="rect")
+
+        # preload every weapon direction so attacking never touches the disk
+        load_weapon_graphics()
+
+        # batched enemy AI, when enabled and numpy is available
+        self.enemy_table = EnemyTable() if BATCHED_ENEMY_AI and np is not None else None
 
-        # draw all sprites in map
+        # draw all sprites in map (or, when streaming, the part around the player)
+        self.streamer = None
         self.create_map()
+        self.visible_sprites.bake_static_layer()
 
         # user interface
         self.ui = UI()
         self.upgrade_menu = UpgradeMenu(self.player)
         self.game_paused = False
 
-        # particles
-        self.animation_player = AnimationPlayer()
-        self.magic_player = MagicPlayer(self.animation_player)
-
     def create_map(self):
-        """Create the level map."""
-        
-        layouts = {
-            "boundary": import_csv_layout("../map/map_FloorBlocks.csv"),
-            "grass": import_csv_layout("../map/map_Grass.csv"),
-            "large_object": import_csv_layout("../map/map_LargeObjects.csv"),
-            "entities": import_csv_layout("../map/map_Entities.csv"),
-        }
+        """Create the level map, from the compiled map when it is up to date."""
 
-        graphics = {
-            "grass": import_folder("../graphics/Grass"),
-            "large_objects": import_folder("../graphics/objects"),
+        self.map_graphics = {
+            "grass": import_folder_cached("../graphics/grass"),
+            "large_objects": import_folder_cached("../graphics/objects"),
         }
 
+        if STREAM_WORLD:
+            self.streamer = WorldStreamer(self, MapSource())
+            self.streamer.start()
+            return
+
+        if compiled_map_is_current(COMPILED_MAP, map_layers.values()):
+            # only the non-empty cells of each layer are visited
+            width, layers = import_compiled_map(COMPILED_MAP)
+            for style, (values, cells) in layers.items():
+                for index in cells:
+                    row_i, col_i = divmod(index, width)
+                    self.create_cell(style, values[index], col_i * TILESIZE, row_i * TILESIZE)
+            return
+
+        layouts = {style: import_csv_layout(path) for style, path in map_layers.items()}
+
         # iterate through each item in 2D list making up the world map
         for style, layout in layouts.items():
             for row_i, row in enumerate(layout):
                 for col_i, col in enumerate(row):
-                    # set position for current sprite
                     if col != "-1":
-                        x = col_i * TILESIZE
-                        y = row_i * TILESIZE
-                        if style == "boundary":
-                            Tile((x, y), [self.obstacle_sprites], "invisible")
-                        if style == "grass":
-                            grass_img = random.choice(graphics["grass"])
-
-                            Tile(
-                                (x, y),
-                                [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites], 
-                                "grass",
-                                grass_img
-                            )
-                        if style == "large_object":
-                            obj_img = graphics["large_objects"][int(col)]
-                            Tile((x, y), [self.visible_sprites, self.obstacle_sprites], 
-                                 "large_object", obj_img)
-                        if style == "entities":
-                            if col == "394": # player
-                                self.player = Player((x, y), [self.visible_sprites],
-                                                    self.obstacle_sprites, self.create_weapon,
-                                                    self.destroy_weapon, self.create_spell,
-                                                    self.destroy_spell)
-                            else:
-                                if col == "390": monster_name = "bamboo"
-                                elif col == "391": monster_name = "spirit"
-                                elif col == "392": monster_name = "raccoon"
-                                else: monster_name = "squid"
-
-                                Enemy(
-                                    monster_name,
-                                    (x, y),
-                                    [self.visible_sprites, self.attackable_sprites],
-                                    self.obstacle_sprites, self.damage_player,
-                                    self.trigger_death_particles, self.award_xp
-                                )
+                        self.create_cell(style, int(col), col_i * TILESIZE, row_i * TILESIZE)
+
+    def create_cell(self, style, col, x, y, grass_img=None):
+        """Create the sprite for one non-empty map cell, and return it.
+        Grass gets a random image unless grass_img is given.
+        """
+
+        if style == "boundary":
+            return Tile((x, y), [self.obstacle_sprites], "invisible")
+        if style == "grass":
+            if grass_img is None:
+                grass_img = rng.choice(self.map_graphics["grass"])
+
+            return Tile(
+                (x, y),
+                [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites,
+                 self.attackable_tiles],
+                "grass",
+                grass_img
+            )
+        if style == "large_object":
+            obj_img = self.map_graphics["large_objects"][col]
+            return Tile((x, y), [self.visible_sprites, self.obstacle_sprites],
+                        "large_object", obj_img)
+        if style == "entities":
+            if col == 394: # player
+                self.player = Player((x, y), [self.visible_sprites],
+                                    self.obstacle_sprites, self.create_weapon,
+                                    self.destroy_weapon, self.create_spell,
+                                    self.destroy_spell)
+                return self.player
+            else:
+                if col == 390: monster_name = "bamboo"
+                elif col == 391: monster_name = "spirit"
+                elif col == 392: monster_name = "raccoon"
+                else: monster_name = "squid"
+
+                return self.create_enemy(monster_name, (x, y))
+
+    def create_enemy(self, monster_name, pos):
+        """Create an enemy and register it with the level."""
+
+        enemy = Enemy(
+            monster_name,
+            pos,
+            [self.visible_sprites, self.attackable_sprites],
+            self.obstacle_sprites, self.damage_player,
+            self.trigger_death_particles, self.award_xp
+        )
+
+        self.enemy_sprites.add(enemy)
+        if self.enemy_table:
+            self.enemy_table.add(enemy)
+
+        return enemy
 
     def create_weapon(self):
         """Create a weapon and draw it on the screen."""
 
-        self.current_attack = Weapon(self.player, [self.visible_sprites, self.attack_sprites])
+        if not REUSE_WEAPON_SPRITE:
+            self.current_attack = Weapon(self.player, [self.visible_sprites, self.attack_sprites])
+            return
+
+        # reuse the pooled sprite; destroy_weapon() only takes it out of its groups
+        if self.weapon_sprite is None:
+            self.weapon_sprite = Weapon(self.player, [])
+        else:
+            self.weapon_sprite.setup(self.player)
+
+        self.weapon_sprite.add(self.visible_sprites, self.attack_sprites)
+        self.current_attack = self.weapon_sprite
 
     def destroy_weapon(self):
         """Remove a weapon from the screen."""
@@ -121,10 +187,10 @@ class Level:
         """Create a spell and draw it on the screen."""
 
         if style == "heal":
-            self.magic_player.heal(self.player, strength, cost, [self.visible_sprites])
+            self.magic_player.heal(self.player, strength, cost)
 
         if style == "flame":
-            self.magic_player.flame(self.player, cost, [self.visible_sprites, self.attack_sprites])
+            self.magic_player.flame(self.player, cost)
 
     def destroy_spell(self):
         """Remove a spell from the screen."""
@@ -136,13 +202,30 @@ class Level:
         If so, handle the logic for an attackable being hit.
         """
 
-        for attack_sprite in self.attack_sprites:
-            # spritecollide() -- checks if the sprite collides with any sprite in the group
-            collision_sprites = pygame.sprite.spritecollide(
-                attack_sprite,
-                self.attackable_sprites,
-                False,
+        # weapons are sprites, flames are attack particles
+        attacks = [(sprite.rect, sprite.sprite_type) for sprite in self.attack_sprites]
+        attacks.extend((rect, "magic") for rect in self.animation_player.particles.get_attack_rects())
+
+        tile_order = self.attackable_tiles.add_order
+
+        for attack_rect, attack_type in attacks:
+            # find every attackable sprite the attack overlaps, testing only
+            # those near it. Enemies are re-filed at the start of each step
+            # and by hitbox, so their search area allows for the difference.
+            tiles = self.attackable_tiles.query(attack_rect)
+            enemies = self.enemy_sprites.query(attack_rect.inflate(TILESIZE, TILESIZE))
+
+            # tiles are handled in the order they were created, as cutting
+            # grass draws from the rng
+            collision_sprites = sorted(
+                (tile for tile in tiles if attack_rect.colliderect(tile.rect)),
+                key=tile_order.__getitem__,
             )
+            collision_sprites.extend(enemy for enemy in enemies
+                                     if attack_rect.colliderect(enemy.rect))
+
+            profiler.count("attack_candidates", len(tiles) + len(enemies))
+            profiler.count("attack_hits", len(collision_sprites))
 
             # for each collision found...
             for target_sprite in collision_sprites:
@@ -150,12 +233,12 @@ class Level:
                     # run particle effect
                     pos = target_sprite.rect.center
                     offset = pygame.math.Vector2(0, 75)
-                    for _ in range(random.randint(3,6)):
-                        self.animation_player.create_grass_particles(pos - offset, [self.visible_sprites])
+                    for _ in range(rng.randint(3,6)):
+                        self.animation_player.create_grass_particles(pos - offset)
                     # destroy the grass
                     target_sprite.kill()
                 else: # must be an enemy
-                    target_sprite.get_damage(self.player, attack_sprite.sprite_type)
+                    target_sprite.get_damage(self.player, attack_type)
 
     def damage_player(self, amount, attack_type):
         """Deal damage to the player."""
@@ -165,52 +248,135 @@ class Level:
         
         self.player.health -= amount
         self.player.vulnerable = False
-        self.player.hurt_time = pygame.time.get_ticks()
+        self.player.hurt_time = game_clock.get_ticks()
 
-        self.animation_player.create_particles(
-            attack_type,
-            self.player.rect.center,
-            [self.visible_sprites]
-        )
+        self.animation_player.create_particles(attack_type, self.player.rect.center)
 
     def trigger_death_particles(self, pos, particle_type):
         """Trigger the particle effects for a monster death."""
 
-        self.animation_player.create_particles(particle_type, pos, [self.visible_sprites])
+        self.animation_player.create_particles(particle_type, pos)
 
     def award_xp(self, amount):
         """Award the player the specified amount of experience points."""
 
         self.player.exp += amount
 
+    def update_enemy_activity(self):
+        """Wake the enemies within ENEMY_ACTIVATION_RADIUS of the player and
+        put the rest of the enemies that were awake back to sleep.
+        """
+
+        # only awake enemies move, so only they need re-filing
+        for enemy in self.active_enemies:
+            if enemy.alive():
+                self.enemy_sprites.update_sprite(enemy)
+
+        radius = ENEMY_ACTIVATION_RADIUS
+        player_pos = pygame.math.Vector2(self.player.rect.center)
+        area = pygame.Rect(0, 0, radius * 2, radius * 2)
+        area.center = self.player.rect.center
+
+        nearby = [enemy for enemy in self.enemy_sprites.query(area)
+                  if player_pos.distance_to(enemy.rect.center) <= radius]
+
+        for enemy in self.active_enemies:
+            enemy.dormant = True
+        for enemy in nearby:
+            enemy.dormant = False
+
+        self.active_enemies = nearby
+
+    def shutdown(self):
+        """Release what the level runs outside the game loop (the world
+        streamer's worker thread), when the level is replaced or the game
+        exits.
+        """
+
+        if self.streamer:
+            self.streamer.shutdown()
+
     def toggle_menu(self):
         """Toggle the game menu."""
 
         self.game_paused = not self.game_paused
 
-    def run(self):
-        """Update and draw the level"""
+    def draw(self, alpha=1.0):
+        """Draw the level. alpha is how far the time being drawn is between
+        the last two simulation steps, used to interpolate moving sprites.
+        """
+
+        profiler.start("custom_draw")
+        self.visible_sprites.custom_draw(self.player, alpha)
+        profiler.stop("custom_draw")
 
-        self.visible_sprites.custom_draw(self.player)
+        profiler.start("hud")
         self.ui.display(self.player)
 
         if self.game_paused:
             # display the upgrade menu
             self.upgrade_menu.display()
+        profiler.stop("hud")
+
+    def run(self):
+        """Update and draw the level"""
+
+        self.draw()
+        self.update()
+
+    def update(self):
+        """Advance the level by one fixed simulation step."""
+
+        self.visible_sprites.store_positions()
+
+        if self.game_paused:
+            # run the upgrade menu
+            self.upgrade_menu.update()
         else:
             # run the game
+            if self.streamer:
+                self.streamer.update()
+            self.update_enemy_activity()
+            self.animation_player.particles.update()
+
+            profiler.start("sprite_update")
             self.visible_sprites.update()
-            self.visible_sprites.enemy_update(self.player)
+            profiler.stop("sprite_update")
+
+            profiler.start("enemy_ai")
+            self.update_enemies()
+            profiler.stop("enemy_ai")
+
+            profiler.start("attack_logic")
             self.run_attack_logic()
+            profiler.stop("attack_logic")
+
+    def update_enemies(self):
+        """Run the AI of every awake enemy."""
+
+        if self.enemy_table:
+            self.enemy_table.update(self.player, self.active_enemies)
+        else:
+            for enemy in self.active_enemies:
+                enemy.enemy_update(self.player)
+
+
+def sort_key(sprite):
+    """Return the value sprites are drawn in order of."""
+
+    return sprite.rect.centery
 
 
 class YSortCameraGroup(pygame.sprite.Group):
     """A custom sprite group with some functions for better camerawork."""
 
-    def __init__(self):
+    def __init__(self, particles):
         # initialize parent class
         super().__init__()
 
+        # the particle pool, drawn in y order with the sprites
+        self.particles = particles
+
         # get the surface, and integers representing half the width and height
         self.display_surface = pygame.display.get_surface()
         
@@ -220,32 +386,278 @@ class YSortCameraGroup(pygame.sprite.Group):
         # create an offset for the camera, starting with [0, 0]
         self.offset = pygame.math.Vector2()
 
+        # the (surface, position) pairs drawn each frame, submitted in one
+        # call through fblits where pygame provides it, blits otherwise
+        self.blit_sequence = []
+        self.drawn_count = 0
+        if hasattr(self.display_surface, "fblits"):
+            self.submit_blits = self.display_surface.fblits
+        else:
+            self.submit_blits = lambda blit_sequence: self.display_surface.blits(blit_sequence, False)
+
         # create the floor
-        self.floor_surf = pygame.image.load("../graphics/tilemap/ground.png").convert()
+        self.floor_surf = load_image_cached("../graphics/tilemap/ground.png", alpha=False)
         self.floor_rect = self.floor_surf.get_rect(topleft=(0, 0))
 
-    def custom_draw(self, player):
+        # static tiles are filed into CHUNK_SIZE chunks by their center, so
+        # only the chunks around the camera need to be looked at. Each chunk
+        # is kept sorted by centery, and since tiles are filed by center a row
+        # of chunks covers its own band of centery values.
+        self.chunks = {}
+        self.static_sprites = {}
+        self.chunk_margin = 0
+
+        # everything else (player, enemies, effects) moves, so it is kept in
+        # its own sorted list and re-inserted when its centery changes
+        self.dynamic_sprites = {}
+        self.dynamic_order = []
+        self.dynamic_keys = []
+
+        # centers of the moving sprites before the last simulation step
+        self.previous_positions = {}
+
+        # optional baked layer: the floor and flat tiles are composited into
+        # CHUNK_SIZE surfaces, and a chunk is only re-baked when marked dirty
+        self.bake_static = BAKE_STATIC_LAYER
+        self.baked_tiles = {}
+        self.baked_sprites = {}
+        self.baked_surfaces = {}
+        self.dirty_chunks = {}
+
+        if self.bake_static:
+            left, top, right, bottom = self.get_chunk_range(self.floor_rect)
+            for chunk_y in range(top, bottom + 1):
+                for chunk_x in range(left, right + 1):
+                    self.dirty_chunks[(chunk_x, chunk_y)] = None
+
+    def add_internal(self, sprite, layer=None):
+        """Add a sprite to the group, indexing it if it is a static tile."""
+
+        super().add_internal(sprite, layer)
+
+        if self.bake_static and isinstance(sprite, Tile) and sprite.sprite_type in BAKED_TILE_TYPES:
+            left, top, right, bottom = self.get_chunk_range(sprite.rect)
+            keys = [(chunk_x, chunk_y) for chunk_y in range(top, bottom + 1)
+                    for chunk_x in range(left, right + 1)]
+            for key in keys:
+                self.baked_tiles.setdefault(key, {})[sprite] = None
+                self.dirty_chunks[key] = None
+            self.baked_sprites[sprite] = keys
+        elif isinstance(sprite, Tile):
+            key = (sprite.rect.centerx // CHUNK_SIZE, sprite.rect.centery // CHUNK_SIZE)
+            chunk = self.chunks.setdefault(key, [])
+            insort(chunk, sprite, key=sort_key)
+            self.static_sprites[sprite] = key
+
+            # how far a sprite can reach outside of the chunk it is filed in
+            reach = max(sprite.rect.width, sprite.rect.height) // 2 + 1
+            self.chunk_margin = max(self.chunk_margin, reach)
+        else:
+            # moving sprites may not have a rect yet, they are ordered on the
+            # next call to update_dynamic_order()
+            self.dynamic_sprites[sprite] = None
+
+    def remove_internal(self, sprite):
+        """Remove a sprite from the group and from the draw order."""
+
+        super().remove_internal(sprite)
+
+        if sprite in self.baked_sprites:
+            for key in self.baked_sprites.pop(sprite):
+                del self.baked_tiles[key][sprite]
+                self.dirty_chunks[key] = None
+        elif sprite in self.static_sprites:
+            key = self.static_sprites.pop(sprite)
+            chunk = self.chunks[key]
+            chunk.remove(sprite)
+            if not chunk:
+                del self.chunks[key]
+        else:
+            centery = self.dynamic_sprites.pop(sprite)
+            if centery is not None:
+                self.remove_from_order(sprite, centery)
+
+    def update(self, *args, **kwargs):
+        """Update the moving sprites. Static tiles have no update logic, so
+        they are skipped rather than called every frame.
+        """
+
+        # sprites can kill themselves while updating
+        for sprite in list(self.dynamic_sprites):
+            sprite.update(*args, **kwargs)
+
+    def remove_from_order(self, sprite, centery):
+        """Take a moving sprite out of the sorted dynamic order."""
+
+        index = bisect_left(self.dynamic_keys, centery)
+        while self.dynamic_order[index] is not sprite:
+            index += 1
+
+        del self.dynamic_order[index]
+        del self.dynamic_keys[index]
+
+    def update_dynamic_order(self):
+        """Re-insert the moving sprites whose centery has changed."""
+
+        for sprite, centery in self.dynamic_sprites.items():
+            new_centery = sprite.rect.centery
+            if new_centery == centery:
+                continue
+
+            if centery is not None:
+                self.remove_from_order(sprite, centery)
+
+            index = bisect_right(self.dynamic_keys, new_centery)
+            self.dynamic_order.insert(index, sprite)
+            self.dynamic_keys.insert(index, new_centery)
+            self.dynamic_sprites[sprite] = new_centery
+
+    def get_camera_rect(self):
+        """Return the area of the world currently covered by the camera."""
+
+        return pygame.Rect(self.offset.x, self.offset.y,
+                           self.half_width * 2, self.half_height * 2)
+
+    def get_chunk_range(self, rect):
+        """Return the first and last chunk columns and rows the rect overlaps."""
+
+        left = rect.left // CHUNK_SIZE
+        top = rect.top // CHUNK_SIZE
+        right = max(rect.right - 1, rect.left) // CHUNK_SIZE
+        bottom = max(rect.bottom - 1, rect.top) // CHUNK_SIZE
+
+        return (left, top, right, bottom)
+
+    def bake_chunk(self, key):
+        """Composite the floor and baked tiles of one chunk into its surface."""
+
+        surf = self.baked_surfaces.get(key)
+        if surf is None:
+            surf = pygame.Surface((CHUNK_SIZE, CHUNK_SIZE)).convert()
+            self.baked_surfaces[key] = surf
+
+        chunk_x = key[0] * CHUNK_SIZE
+        chunk_y = key[1] * CHUNK_SIZE
+
+        surf.fill(WATER_COLOR)
+        surf.blit(self.floor_surf, (self.floor_rect.x - chunk_x, self.floor_rect.y - chunk_y))
+
+        for tile in sorted(self.baked_tiles.get(key, ()), key=sort_key):
+            surf.blit(tile.image, (tile.rect.x - chunk_x, tile.rect.y - chunk_y))
+
+        self.dirty_chunks.pop(key, None)
+
+    def bake_static_layer(self):
+        """Bake every dirty chunk; called once the map has been created."""
+
+        for key in list(self.dirty_chunks):
+            self.bake_chunk(key)
+
+    def add_baked_blits(self, rect, blit_sequence, offset_x, offset_y):
+        """Queue the baked chunks touching the rect, re-baking dirty ones."""
+
+        left, top, right, bottom = self.get_chunk_range(rect)
+
+        for chunk_y in range(top, bottom + 1):
+            for chunk_x in range(left, right + 1):
+                key = (chunk_x, chunk_y)
+                if key in self.dirty_chunks:
+                    self.bake_chunk(key)
+
+                surf = self.baked_surfaces.get(key)
+                if surf:
+                    blit_sequence.append((surf, (chunk_x * CHUNK_SIZE - offset_x,
+                                                 chunk_y * CHUNK_SIZE - offset_y)))
+
+    def get_static_order(self, rect):
+        """Yield the static sprites touching the rect, sorted by centery."""
+
+        area = rect.inflate(self.chunk_margin * 2, self.chunk_margin * 2)
+        left, top, right, bottom = self.get_chunk_range(area)
+
+        for chunk_y in range(top, bottom + 1):
+            row = [self.chunks[(chunk_x, chunk_y)] for chunk_x in range(left, right + 1)
+                   if (chunk_x, chunk_y) in self.chunks]
+
+            for sprite in merge(*row, key=sort_key):
+                if sprite.rect.colliderect(rect):
+                    yield sprite
+
+    def get_draw_order(self, camera_rect):
+        """Return every sprite and particle inside the camera, sorted by
+        centery (particles last among equals).
+        """
+
+        self.update_dynamic_order()
+        dynamic = [sprite for sprite in self.dynamic_order
+                   if sprite.rect.colliderect(camera_rect)]
+        particles = self.particles.get_draw_order(camera_rect)
+
+        return merge(self.get_static_order(camera_rect), dynamic, particles, key=sort_key)
+
+    def store_positions(self):
+        """Remember where the moving sprites are before a simulation step, so
+        drawing can interpolate between the last two steps.
+        """
+
+        self.previous_positions = {sprite: sprite.rect.center for sprite in self.dynamic_sprites}
+
+    def get_draw_shifts(self, alpha):
+        """Return how far each moving sprite should be drawn behind where it
+        was simulated, alpha of the way from its previous position.
+        """
+
+        lag = 1 - alpha
+        if not lag:
+            return {}
+
+        return {
+            sprite: (round((sprite.rect.centerx - prev_x) * lag),
+                     round((sprite.rect.centery - prev_y) * lag))
+            for sprite, (prev_x, prev_y) in self.previous_positions.items()
+        }
+
+    def custom_draw(self, player, alpha=1.0):
         """Draw visible sprites, offsetting by the player's position."""
 
+        shifts = self.get_draw_shifts(alpha)
+        player_shift_x, player_shift_y = shifts.get(player, (0, 0))
+
         # get the offset
-        self.offset.x = player.rect.centerx - self.half_width
-        self.offset.y = player.rect.centery - self.half_height
-
-        # draw floor with offset
-        offset_pos = self.floor_rect.topleft - self.offset
-        self.display_surface.blit(self.floor_surf, offset_pos)
-
-        # draw sprites with offset (keeping player in the center of the screen)
-        # for sprite in self.sprites():
-        for sprite in sorted(self.sprites(), key=lambda x: x.rect.centery):
-            offset_pos = sprite.rect.topleft - self.offset
-            self.display_surface.blit(sprite.image, offset_pos)
-
-    def enemy_update(self, player):
-        """Draw and update enemy entities."""
-
-        enemy_sprites = [sprite for sprite in self.sprites() 
-                        if hasattr(sprite, "sprite_type") 
-                        and sprite.sprite_type == "enemy"]
-        for sprite in enemy_sprites:
-            sprite.enemy_update(player)
+        self.offset.x = player.rect.centerx - player_shift_x - self.half_width
+        self.offset.y = player.rect.centery - player_shift_y - self.half_height
+
+        camera_rect = self.get_camera_rect()
+        offset_x = int(self.offset.x)
+        offset_y = int(self.offset.y)
+
+        # everything is queued into one sequence and blitted in a single call.
+        # The list is reused, but each entry is a fresh (image, (x, y)) tuple:
+        # positions change every frame, and rewriting per-sprite mutable
+        # entries in place measured no faster than building the tuples.
+        blit_sequence = self.blit_sequence
+        blit_sequence.clear()
+
+        # floor with offset (or the baked chunks holding it)
+        if self.bake_static:
+            self.add_baked_blits(camera_rect, blit_sequence, offset_x, offset_y)
+        else:
+            blit_sequence.append((self.floor_surf, (self.floor_rect.x - offset_x,
+                                                    self.floor_rect.y - offset_y)))
+
+        # on-screen sprites and particles with offset (keeping player in the center of the screen)
+        sprites_start = len(blit_sequence)
+        for sprite in self.get_draw_order(camera_rect):
+            pos_x = sprite.rect.x - offset_x
+            pos_y = sprite.rect.y - offset_y
+
+            if sprite in shifts:
+                shift_x, shift_y = shifts[sprite]
+                pos_x -= shift_x
+                pos_y -= shift_y
+
+            blit_sequence.append((sprite.image, (pos_x, pos_y)))
+
+        self.drawn_count = len(blit_sequence) - sprites_start
+
+        self.submit_blits(blit_sequence)
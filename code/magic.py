@@ -1,11 +1,11 @@
 """Contains all code needed to create and manage a spell."""
 
 
-import random
-
 import pygame
 
 from settings import *
+from sounds import sound_bank
+from game_random import rng
 
 
 class MagicPlayer:
@@ -14,14 +14,11 @@ class MagicPlayer:
     def __init__(self, animation_player):
         self.animation_player = animation_player
         self.sounds = {
-            "heal": pygame.mixer.Sound("../audio/heal.wav"),
-            "flame": pygame.mixer.Sound("../audio/flame.wav"),
+            "heal": sound_bank.get("heal"),
+            "flame": sound_bank.get("flame"),
         }
 
-        for _, sound in self.sounds.items():
-            sound.set_volume(0.4)
-
-    def heal(self, player, strength, cost, groups):
+    def heal(self, player, strength, cost):
         """A spell which heals the player."""
         
         if player.energy >= cost:
@@ -35,15 +32,13 @@ class MagicPlayer:
             self.animation_player.create_particles(
                 "aura",
                 player.rect.center,
-                groups,
             )
             self.animation_player.create_particles(
                 "heal",
                 player.rect.center + pygame.math.Vector2(0, -60),
-                groups,
             )
 
-    def flame(self, player, cost, groups):
+    def flame(self, player, cost):
         """A fire spell which damages enemies."""
         
         if player.energy >= cost:
@@ -63,11 +58,11 @@ class MagicPlayer:
             for i in range(1, 6):
                 if direction.x: # horizontal
                     offset_x = (direction.x * i) * TILESIZE
-                    x = player.rect.centerx + offset_x + random.randint(-TILESIZE // 3, TILESIZE // 3)
-                    y = player.rect.centery + random.randint(-TILESIZE // 3, TILESIZE // 3)
-                    self.animation_player.create_particles("flame", (x, y), groups)
+                    x = player.rect.centerx + offset_x + rng.randint(-TILESIZE // 3, TILESIZE // 3)
+                    y = player.rect.centery + rng.randint(-TILESIZE // 3, TILESIZE // 3)
+                    self.animation_player.create_particles("flame", (x, y), attack=True)
                 else: # vertical
                     offset_y = (direction.y * i) * TILESIZE
-                    x = player.rect.centerx + random.randint(-TILESIZE // 3, TILESIZE // 3)
-                    y = player.rect.centery + offset_y + random.randint(-TILESIZE // 3, TILESIZE // 3)
-                    self.animation_player.create_particles("flame", (x, y), groups)
+                    x = player.rect.centerx + rng.randint(-TILESIZE // 3, TILESIZE // 3)
+                    y = player.rect.centery + offset_y + rng.randint(-TILESIZE // 3, TILESIZE // 3)
+                    self.animation_player.create_particles("flame", (x, y), attack=True)
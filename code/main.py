@@ -1,19 +1,34 @@
-"""Main python script. Contains the "Game" class, which runs the game."""
+"""Main python script. Contains the "Game" class, which runs the game.
 
+    python main.py [--record FILE | --replay FILE [--unthrottled]] [--load-report]
+"""
 
+
+import argparse
 import sys
+from time import perf_counter
 
 import pygame
 
 from settings import *
 from level import Level
+from assets import load_assets
+from sounds import sound_bank
+import game_clock
+import game_random
+from profiler import profiler, ProfilerOverlay
+from replay import InputLog, InputRecorder, InputReplayer
 
 
 class Game:
     """A running instance of our game."""
 
-    def __init__(self):
-        """Initialize a new Game object."""
+    def __init__(self, record_path=None, replay_path=None, unthrottled=False, load_report=False):
+        """Initialize a new Game object. The session's input is recorded to
+        record_path, or the input recorded in replay_path is played back
+        (one step per frame, as fast as possible, if unthrottled). The asset
+        load times are printed if load_report is set.
+        """
 
         # general setup
         pygame.init() # initialize pygame
@@ -25,40 +40,175 @@ class Game:
         # set up clock for steady fps
         self.clock = pygame.time.Clock()
 
+        # load every image up front, behind a loading screen
+        self.loading_width = None
+        report = load_assets(self.show_loading)
+        if load_report:
+            print(report.format())
+
+        # seed the game's rng before the level is built, as building it
+        # already makes random choices
+        if replay_path:
+            log = InputLog.load(replay_path)
+            if log.tick_rate != TICK_RATE:
+                sys.exit(f"{replay_path} was recorded at {log.tick_rate} ticks per second, not {TICK_RATE}")
+            game_random.reseed(log.seed)
+        else:
+            log = InputLog(game_random.reseed())
+
         # initialize a new level
         self.level = Level()
 
+        # input recording / replay
+        self.record_path = record_path
+        self.recorder = InputRecorder(log) if record_path and not replay_path else None
+        self.replayer = InputReplayer(log, self.level) if replay_path else None
+        self.unthrottled = unthrottled and self.replayer is not None
+
+        # a recorded session must load chunks on the same steps when replayed
+        if self.level.streamer and (self.recorder or self.replayer):
+            self.level.streamer.deterministic = True
+        self.frame_times = []
+
+        # performance overlay, toggled with F3
+        self.profiler_overlay = ProfilerOverlay(profiler, self.level)
+
         # set up bg music
-        self.music = pygame.mixer.Sound("../audio/main.ogg")
-        self.music.set_volume(0.5)
+        self.music = sound_bank.get("music")
         self.music.play(loops=-1)
 
+    def show_loading(self, done, total):
+        """Draw the loading screen's progress bar, when it has grown."""
+
+        bg_rect = pygame.Rect(0, 0, WIDTH // 3, BAR_HEIGHT)
+        bg_rect.center = (WIDTH // 2, HEIGHT // 2)
+
+        width = bg_rect.width * done // total
+        if width == self.loading_width:
+            return
+
+        # keep the window responsive while loading
+        pygame.event.pump()
+
+        # the whole screen is only drawn the first time, then just the bar
+        if self.loading_width is None:
+            self.screen.fill(WATER_COLOR)
+            pygame.display.update()
+        self.loading_width = width
+
+        pygame.draw.rect(self.screen, UI_BG_COLOR, bg_rect)
+        pygame.draw.rect(self.screen, ENERGY_COLOR, (bg_rect.left, bg_rect.top, width, bg_rect.height))
+        pygame.draw.rect(self.screen, UI_BORDER_COLOR, bg_rect, 3)
+        pygame.display.update(bg_rect)
+
+    def step(self):
+        """Run one simulation step, recording or replaying its input."""
+
+        if self.replayer:
+            if self.replayer.finished():
+                self.quit()
+            self.replayer.advance()
+        elif self.recorder:
+            self.recorder.capture()
+
+        self.level.update()
+        game_clock.advance()
+
+    def quit(self):
+        """Save the recording or report the replay's timings, and exit."""
+
+        if self.recorder:
+            self.recorder.log.save(self.record_path)
+            print(f"recorded {len(self.recorder.log)} steps to {self.record_path}")
+
+        if self.replayer and self.frame_times:
+            frame_times = sorted(self.frame_times)
+            total = sum(frame_times)
+            print(f"replayed {self.replayer.step_index} steps in {len(frame_times)} frames, {total:.2f}s")
+            print(f"frame time: mean {total / len(frame_times) * 1000:.3f} ms, "
+                  f"p95 {frame_times[int(len(frame_times) * 0.95)] * 1000:.3f} ms, "
+                  f"max {frame_times[-1] * 1000:.3f} ms")
+
+        self.level.shutdown()
+        pygame.quit()
+        sys.exit()
+
     def run(self):
-        """Run the game. Set up a game loop and an event listener."""
+        """Run the game. Set up a game loop and an event listener.
+
+        The simulation runs in fixed steps of game_clock.STEP_MS, as many as
+        the elapsed time calls for (up to MAX_CATCHUP_STEPS per frame), and
+        each rendered frame is interpolated between the last two steps. An
+        unthrottled replay runs one step per frame instead.
+        """
+
+        # time not yet simulated, in milliseconds
+        accumulator = 0.0
+        self.clock.tick()
 
         # event loop
         while True:
+            frame_start = perf_counter()
+            accumulator += self.clock.tick(0 if self.unthrottled else FPS)
+
             # get events
+            profiler.start("events")
             for event in pygame.event.get():
                 # if player quit, stop the program
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
                 if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_m:
+                    # a replay toggles the menu where the recording did
+                    if event.key == pygame.K_m and not self.replayer:
                         self.level.toggle_menu()
-                
+                        if self.recorder:
+                            self.recorder.toggle_menu()
+                    if event.key == pygame.K_F3:
+                        profiler.toggle()
+            profiler.stop("events")
+
+            if self.unthrottled:
+                self.step()
+                accumulator = game_clock.STEP_MS
+            else:
+                # run the simulation steps that are due
+                steps = 0
+                while accumulator >= game_clock.STEP_MS and steps < MAX_CATCHUP_STEPS:
+                    self.step()
+                    accumulator -= game_clock.STEP_MS
+                    steps += 1
+
+                # too far behind to catch up: drop the backlog rather than spiral
+                if accumulator >= game_clock.STEP_MS:
+                    accumulator %= game_clock.STEP_MS
+
             # fill in screen
             self.screen.fill(WATER_COLOR)
-            # call the current level's run method
-            self.level.run()
+            # draw the current level between its last two steps
+            self.level.draw(accumulator / game_clock.STEP_MS)
+            if profiler.enabled:
+                self.profiler_overlay.display()
             # update screen
+            profiler.start("display_update")
             pygame.display.update()
-            # update clock
-            self.clock.tick(FPS)
+            profiler.stop("display_update")
+
+            profiler.end_frame(self.clock.get_time())
+            if self.replayer:
+                self.frame_times.append(perf_counter() - frame_start)
 
 
 # !---------------------------------------------------------------------------
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Play PyRPG.")
+    session = parser.add_mutually_exclusive_group()
+    session.add_argument("--record", metavar="FILE", help="record the session's input to FILE")
+    session.add_argument("--replay", metavar="FILE", help="play back a recorded session")
+    parser.add_argument("--unthrottled", action="store_true",
+                        help="replay one step per frame, as fast as possible")
+    parser.add_argument("--load-report", action="store_true",
+                        help="print how long loading each asset folder took")
+    args = parser.parse_args()
+
+    game = Game(args.record, args.replay, args.unthrottled, args.load_report)
     game.run()
@@ -1,52 +1,58 @@
 """Contains all code needed to create and manage a particle effect."""
 
 
-import random
-
 import pygame
 
-from support import import_folder
+from support import import_folder_cached
+from game_random import rng
+
+
+# the frames folder of every particle animation
+particle_folders = {
+    # magic
+    "flame": "../graphics/particles/flame/frames",
+    "aura": "../graphics/particles/aura",
+    "heal": "../graphics/particles/heal/frames",
+
+    # attacks
+    "claw": "../graphics/particles/claw",
+    "slash": "../graphics/particles/slash",
+    "sparkle": "../graphics/particles/sparkle",
+    "leaf_attack": "../graphics/particles/leaf_attack",
+    "thunder": "../graphics/particles/thunder",
+
+    # monster deaths
+    "squid": "../graphics/particles/smoke_orange",
+    "raccoon": "../graphics/particles/raccoon",
+    "spirit": "../graphics/particles/nova",
+    "bamboo": "../graphics/particles/bamboo",
+}
+
+# the grass leaf animations, also used flipped
+leaf_folders = [f"../graphics/particles/leaf{leaf}" for leaf in range(1, 7)]
 
 
 class AnimationPlayer:
     """A manager for particle effect animations."""
     
     def __init__(self):
+        self.particles = ParticlePool()
+
         self.frames = {
-			# magic
-			"flame": import_folder("../graphics/particles/flame/frames"),
-			"aura": import_folder("../graphics/particles/aura"),
-			"heal": import_folder("../graphics/particles/heal/frames"),
-			
-			# attacks 
-			"claw": import_folder("../graphics/particles/claw"),
-			"slash": import_folder("../graphics/particles/slash"),
-			"sparkle": import_folder("../graphics/particles/sparkle"),
-			"leaf_attack": import_folder("../graphics/particles/leaf_attack"),
-			"thunder": import_folder("../graphics/particles/thunder"),
-
-			# monster deaths
-			"squid": import_folder("../graphics/particles/smoke_orange"),
-			"raccoon": import_folder("../graphics/particles/raccoon"),
-			"spirit": import_folder("../graphics/particles/nova"),
-			"bamboo": import_folder("../graphics/particles/bamboo"),
-			
-			# leafs 
-			"leaf": (
-				import_folder("../graphics/particles/leaf1"),
-				import_folder("../graphics/particles/leaf2"),
-				import_folder("../graphics/particles/leaf3"),
-				import_folder("../graphics/particles/leaf4"),
-				import_folder("../graphics/particles/leaf5"),
-				import_folder("../graphics/particles/leaf6"),
-				self.reflect_images(import_folder("../graphics/particles/leaf1")),
-				self.reflect_images(import_folder("../graphics/particles/leaf2")),
-				self.reflect_images(import_folder("../graphics/particles/leaf3")),
-				self.reflect_images(import_folder("../graphics/particles/leaf4")),
-				self.reflect_images(import_folder("../graphics/particles/leaf5")),
-				self.reflect_images(import_folder("../graphics/particles/leaf6")),
-            ),
+            animation_type: import_folder_cached(folder)
+            for animation_type, folder in particle_folders.items()
         }
+        # leafs, facing both ways
+        leaves = [import_folder_cached(folder) for folder in leaf_folders]
+        self.frames["leaf"] = tuple(leaves + [self.reflect_images(leaf) for leaf in leaves])
+
+        # register every animation with the particle pool
+        self.animation_ids = {}
+        for animation_type, frames in self.frames.items():
+            if animation_type == "leaf":
+                self.animation_ids[animation_type] = [self.particles.add_animation(leaf) for leaf in frames]
+            else:
+                self.animation_ids[animation_type] = self.particles.add_animation(frames)
 
     def reflect_images(self, frames):
         """Return a list of frames, with each frame flipped."""
@@ -60,43 +66,144 @@ class AnimationPlayer:
 
         return new_frames
 
-    def create_grass_particles(self, pos, groups):
+    def create_grass_particles(self, pos):
         """Manage a new leaf particle effect."""
 
-        animation_frames = random.choice(self.frames["leaf"])
-        ParticleEffect(pos, animation_frames, groups)
+        animation_id = rng.choice(self.animation_ids["leaf"])
+        self.particles.spawn(animation_id, pos)
+
+    def create_particles(self, animation_type, pos, attack=False):
+        """Create particle effects based on the provided animation type.
+        Attack particles (i.e. flames) also damage whatever they touch.
+        """
+
+        animation_id = self.animation_ids[animation_type]
+        self.particles.spawn(animation_id, pos, attack)
 
-    def create_particles(self, animation_type, pos, groups):
-        """Create particle effects based on the provided animation type."""
 
-        animation_frames = self.frames[animation_type]
-        ParticleEffect(pos, animation_frames, groups)
+class ParticleView:
+    """A particle's rect and current frame, shaped like a sprite so the
+    camera can draw it in y order with them.
+    """
 
-class ParticleEffect(pygame.sprite.Sprite):
-    """A particle effect; i.e. spell effects, etc."""
+    __slots__ = ("rect", "image")
 
-    def __init__(self, pos, animation_frames, groups):
-        super().__init__(groups)
+    def __init__(self, rect):
+        self.rect = rect
+        self.image = None
 
-        self.frame_index = 0
+
+class ParticlePool:
+    """Every live particle effect, kept in preallocated per-slot lists with
+    a free list of unused slots, instead of one sprite per effect.
+    """
+
+    def __init__(self, capacity=256):
         self.animation_speed = 0.15
-        self.frames = animation_frames
 
-        self.image = self.frames[self.frame_index]
-        self.rect = self.image.get_rect(center=pos)
+        # registered animations: id -> list of frames
+        self.animations = []
+
+        # per-slot particle state
+        self.rects = []
+        self.animation_ids = []
+        self.frame_indices = []
+        self.attacks = []
+        self.views = []
+
+        self.free_slots = []
+        self.live_slots = []
+
+        self.grow(capacity)
+
+    def grow(self, capacity):
+        """Add slots to the pool until it holds the given number."""
+
+        old_capacity = len(self.rects)
+        new_slots = range(old_capacity, capacity)
+
+        self.rects.extend(pygame.Rect(0, 0, 0, 0) for _ in new_slots)
+        self.animation_ids.extend(0 for _ in new_slots)
+        self.frame_indices.extend(0.0 for _ in new_slots)
+        self.attacks.extend(False for _ in new_slots)
+        self.views.extend(ParticleView(self.rects[slot]) for slot in new_slots)
+
+        # pop() hands out the lowest free slot first
+        self.free_slots[:0] = reversed(new_slots)
 
-        self.sprite_type = "magic"
+    def add_animation(self, frames):
+        """Register a list of frames and return its animation id."""
 
-    def animate(self):
-        """Handle the animation of a particle effect."""
+        self.animations.append(frames)
 
-        self.frame_index += self.animation_speed
-        if self.frame_index >= len(self.frames):
-            self.kill()
-        else:
-            self.image = self.frames[int(self.frame_index)]
+        return len(self.animations) - 1
+
+    def spawn(self, animation_id, pos, attack=False):
+        """Start a particle effect centered on pos."""
+
+        if not self.free_slots:
+            self.grow(len(self.rects) * 2)
+
+        slot = self.free_slots.pop()
+
+        # like a sprite, the rect is sized to the first frame
+        first_frame = self.animations[animation_id][0]
+        rect = self.rects[slot]
+        rect.size = first_frame.get_size()
+        rect.center = pos
+
+        self.animation_ids[slot] = animation_id
+        self.frame_indices[slot] = 0.0
+        self.attacks[slot] = attack
+
+        self.live_slots.append(slot)
 
     def update(self):
-        """Update the particle effect on the screen."""
+        """Advance every live particle, freeing the ones that have finished."""
+
+        animations = self.animations
+        animation_ids = self.animation_ids
+        frame_indices = self.frame_indices
+        live_slots = self.live_slots
+
+        kept = 0
+        for slot in live_slots:
+            frame_index = frame_indices[slot] + self.animation_speed
+
+            if frame_index >= len(animations[animation_ids[slot]]):
+                self.free_slots.append(slot)
+            else:
+                frame_indices[slot] = frame_index
+                live_slots[kept] = slot
+                kept += 1
+
+        del live_slots[kept:]
+
+    def get_attack_rects(self):
+        """Return the rects of the live attack particles."""
+
+        return [self.rects[slot] for slot in self.live_slots if self.attacks[slot]]
+
+    def get_draw_order(self, view_rect):
+        """Return the views of the live particles inside view_rect, sorted
+        by centery.
+        """
+
+        animations = self.animations
+        animation_ids = self.animation_ids
+        frame_indices = self.frame_indices
+        views = self.views
+
+        visible = []
+        for slot in self.live_slots:
+            view = views[slot]
+            if view.rect.colliderect(view_rect):
+                view.image = animations[animation_ids[slot]][int(frame_indices[slot])]
+                visible.append(view)
+
+        visible.sort(key=lambda view: view.rect.centery)
+
+        return visible
 
-        self.animate()
+    def __len__(self):
+        return len(self.live_slots)
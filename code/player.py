@@ -3,8 +3,20 @@
 import pygame
 
 from settings import *
-from support import import_folder
+from support import import_folder_cached, import_flash_frames_cached, load_image_cached
 from entity import Entity
+from sounds import sound_bank
+import game_clock
+import controls
+
+
+# the player's animations, each a folder in graphics/player
+player_animations = (
+    "right", "left", "up", "down",
+    "right_idle", "left_idle", "up_idle", "down_idle",
+    "right_attack", "left_attack", "up_attack", "down_attack",
+)
+
 
 class Player(Entity):
     """The player avatar."""
@@ -17,8 +29,7 @@ class Player(Entity):
         # graphics setup
         self.import_player_assets()
 
-        self.image = pygame.image.load("../graphics/player/down_idle/idle_down.png")
-        self.image.convert_alpha()
+        self.image = load_image_cached("../graphics/player/down_idle/idle_down.png")
 
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(-6, HITBOX_OFFSET["player"])
@@ -67,36 +78,24 @@ class Player(Entity):
         self.invulnerability_duration = 500
 
         # import sound
-        self.weapon_attack_sound = pygame.mixer.Sound("../audio/sword.wav")
-        self.weapon_attack_sound.set_volume(0.4)
+        self.weapon_attack_sound = sound_bank.get("sword")
 
     def import_player_assets(self):
         """Load in all assets related to the player"""
 
         character_path = "../graphics/player"
-        self.animations = {
-            "right": [],
-            "left": [],
-            "up": [],
-            "down": [],
-            "right_idle": [],
-            "left_idle": [],
-            "up_idle": [],
-            "down_idle": [],
-            "right_attack": [],
-            "left_attack": [],
-            "up_attack": [],
-            "down_attack": [],
-        }
-
-        for animation in self.animations.keys():
+        self.animations = {}
+        self.flash_animations = {}
+
+        for animation in player_animations:
             full_path = f"{character_path}/{animation}"
-            self.animations[animation] = import_folder(full_path)
+            self.animations[animation] = import_folder_cached(full_path)
+            self.flash_animations[animation] = import_flash_frames_cached(full_path)
 
     def input(self):
         """Collect and process input from the player."""
         if not self.attacking:
-            keys = pygame.key.get_pressed()
+            keys = controls.get_pressed()
 
             # movement input
             # vertical movement
@@ -121,7 +120,7 @@ class Player(Entity):
             # atack input
             if keys[pygame.K_SPACE]:
                 self.attacking = True
-                self.attack_time = pygame.time.get_ticks()
+                self.attack_time = game_clock.get_ticks()
 
                 self.create_weapon()
                 self.weapon_attack_sound.play()
@@ -129,7 +128,7 @@ class Player(Entity):
             # magic input
             if keys[pygame.K_LCTRL]:
                 self.attacking = True
-                self.attack_time = pygame.time.get_ticks()
+                self.attack_time = game_clock.get_ticks()
 
                 self.create_spell(
                     self.spell,
@@ -140,7 +139,7 @@ class Player(Entity):
             # select weapon
             if keys[pygame.K_q] and self.can_switch_weapon:
                 self.can_switch_weapon = False
-                self.weapon_switch_time = pygame.time.get_ticks()
+                self.weapon_switch_time = game_clock.get_ticks()
                 if self.weapon_index < len(list(weapon_data.keys())) - 1:
                     self.weapon_index += 1
                 else:
@@ -150,7 +149,7 @@ class Player(Entity):
             # select spell
             if keys[pygame.K_e] and self.can_switch_spell:
                 self.can_switch_spell = False
-                self.spell_switch_time = pygame.time.get_ticks()
+                self.spell_switch_time = game_clock.get_ticks()
                 if self.spell_index < len(list(magic_data.keys())) - 1:
                     self.spell_index += 1
                 else:
@@ -185,7 +184,7 @@ class Player(Entity):
     def cooldowns(self):
         """Manage player cooldowns with a custom timer."""
 
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
 
         # attack cooldown
         if self.attacking:
@@ -243,17 +242,14 @@ class Player(Entity):
         if self.frame_index >= len(animation):
             self.frame_index = 0
 
+        # flicker when hit, by switching to the faded out frames
+        if not self.vulnerable and not self.wave_value():
+            animation = self.flash_animations[self.status]
+
         # set the image
         self.image = animation[int(self.frame_index)]
         self.rect = self.image.get_rect(center=self.hitbox.center)
 
-        # flicker when hit
-        if not self.vulnerable:
-            alpha = self.wave_value()
-            self.image.set_alpha(alpha)
-        else:
-            self.image.set_alpha(255)
-
     def get_value_by_index(self, index):
         """Get a stat's value by a given index."""
 
@@ -0,0 +1,237 @@
+"""Contains the in-game profiler, which times each phase of a frame, and the
+overlay which displays its timings. Replaces the old debug() helper: values
+passed to profiler.note() are listed in the overlay.
+
+Toggle the overlay in-game with F3.
+"""
+
+from array import array
+from time import perf_counter
+
+import pygame
+
+from settings import *
+from text_cache import text_cache
+
+
+# the phases of a frame, in the order they run
+PHASES = (
+    "events",
+    "custom_draw",
+    "sprite_update",
+    "enemy_ai",
+    "attack_logic",
+    "hud",
+    "display_update",
+)
+
+
+class RingBuffer:
+    """A fixed number of float samples, overwriting the oldest when full."""
+
+    def __init__(self, capacity):
+        self.samples = array("d", [0.0]) * capacity
+        self.capacity = capacity
+        self.index = 0
+        self.count = 0
+
+    def append(self, value):
+        """Store a sample, dropping the oldest one if the buffer is full."""
+
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def values(self):
+        """Return the stored samples, oldest first."""
+
+        if self.count < self.capacity:
+            return self.samples[:self.count]
+
+        return self.samples[self.index:] + self.samples[:self.index]
+
+    def latest(self):
+        """Return the newest sample."""
+
+        return self.samples[self.index - 1] if self.count else 0.0
+
+    def mean(self):
+        """Return the mean of the stored samples."""
+
+        return sum(self.values()) / self.count if self.count else 0.0
+
+    def max(self):
+        """Return the largest stored sample."""
+
+        return max(self.values()) if self.count else 0.0
+
+
+class Profiler:
+    """Times the phases of each frame into ring buffers. Timing calls only
+    check a flag while it is disabled.
+    """
+
+    def __init__(self, history=PROFILER_HISTORY):
+        self.enabled = False
+        self.toggle_requested = False
+
+        # phase -> time spent in it this frame, and when it was last started
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.started = dict.fromkeys(PHASES, 0.0)
+
+        # the last frames, in milliseconds
+        self.frame_times = RingBuffer(history)
+        self.phase_times = {phase: RingBuffer(history) for phase in PHASES}
+
+        # counter -> total this frame, and the totals of the last frame
+        self.counts = {}
+        self.last_counts = {}
+
+        # label -> value, listed in the overlay
+        self.notes = {}
+
+    def toggle(self):
+        """Switch the profiler on or off at the end of the current frame,
+        so no phase is left half-timed.
+        """
+
+        self.toggle_requested = True
+
+    def start(self, phase):
+        """Start timing a phase."""
+
+        if self.enabled:
+            self.started[phase] = perf_counter()
+
+    def stop(self, phase):
+        """Stop timing a phase, adding the time to this frame's total."""
+
+        if self.enabled:
+            self.current[phase] += perf_counter() - self.started[phase]
+
+    def count(self, name, amount):
+        """Add to a per-frame counter, such as how many sprites were tested."""
+
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def note(self, label, value):
+        """Show a value in the overlay, like the old debug() did."""
+
+        if self.enabled:
+            self.notes[label] = value
+
+    def end_frame(self, frame_time):
+        """Store this frame's timings, given the frame's length in ms."""
+
+        if self.enabled:
+            self.frame_times.append(frame_time)
+            for phase, elapsed in self.current.items():
+                self.phase_times[phase].append(elapsed * 1000)
+                self.current[phase] = 0.0
+
+            self.last_counts = self.counts
+            self.counts = {}
+
+        if self.toggle_requested:
+            self.toggle_requested = False
+            self.enabled = not self.enabled
+            self.current = dict.fromkeys(PHASES, 0.0)
+            self.counts = {}
+            self.last_counts = {}
+            self.notes.clear()
+
+
+class ProfilerOverlay:
+    """Draws the profiler's frame-time graph, phase timings and the level's
+    sprite counts in the top-right corner of the screen. The overlay is
+    drawn onto its own surface every PROFILER_REFRESH_MS, and that surface
+    is blitted on the frames in between.
+    """
+
+    def __init__(self, profiler, level):
+        self.profiler = profiler
+        self.level = level
+
+        self.display_surface = pygame.display.get_surface()
+        self.font = pygame.font.Font(None, 20)
+        self.line_height = self.font.get_linesize()
+
+        self.width = 300
+        self.graph_height = 60
+        self.left = self.display_surface.get_width() - self.width - 10
+        self.top = 10
+
+        self.surface = None
+        self.last_refresh = 0
+
+    def get_lines(self):
+        """Return the lines of text shown under the graph."""
+
+        profiler = self.profiler
+        level = self.level
+        frame_times = profiler.frame_times
+
+        lines = [f"frame {frame_times.latest():5.1f} ms  avg {frame_times.mean():5.1f}  max {frame_times.max():5.1f}"]
+        lines += [f"{phase:<15} {times.mean():6.2f} ms  max {times.max():6.2f}"
+                  for phase, times in profiler.phase_times.items()]
+
+        lines.append(f"visible {level.visible_sprites.drawn_count}  obstacles {len(level.obstacle_sprites)}")
+        lines.append(f"particles {len(level.animation_player.particles)}  "
+                     f"enemies {len(level.active_enemies)}/{len(level.enemy_sprites)}")
+        lines.append(f"hud rebuilds {level.ui.rebuild_count}")
+        lines += [f"{name} {value}" for name, value in profiler.last_counts.items()]
+        lines += [f"{label}: {value}" for label, value in profiler.notes.items()]
+
+        return lines
+
+    def show_graph(self, surface, rect):
+        """Draw the frame times as a line graph, scaled to two 60 fps frames."""
+
+        scale = rect.height / (2000 / 60)
+
+        # the 60 fps budget
+        budget_y = rect.bottom - round(1000 / 60 * scale)
+        pygame.draw.line(surface, "#555555", (rect.left, budget_y), (rect.right - 1, budget_y))
+
+        values = self.profiler.frame_times.values()
+        if len(values) < 2:
+            return
+
+        step = rect.width / (self.profiler.frame_times.capacity - 1)
+        points = [(rect.left + i * step, max(rect.top, rect.bottom - value * scale))
+                  for i, value in enumerate(values)]
+        pygame.draw.lines(surface, "#7CFC00", False, points)
+
+    def refresh(self):
+        """Redraw the overlay's surface from the latest timings."""
+
+        lines = self.get_lines()
+
+        height = self.graph_height + len(lines) * self.line_height + 15
+        if self.surface is None or self.surface.get_height() != height:
+            self.surface = pygame.Surface((self.width, height)).convert()
+        self.surface.fill("Black")
+
+        graph_rect = pygame.Rect(5, 5, self.width - 10, self.graph_height)
+        self.show_graph(self.surface, graph_rect)
+
+        # lines that haven't changed since the last refresh are cache hits
+        y = graph_rect.bottom + 5
+        self.surface.blits([
+            (text_cache.render(self.font, line, True, "White"), (5, y + i * self.line_height))
+            for i, line in enumerate(lines)
+        ], False)
+
+    def display(self):
+        """Draw the overlay, refreshing it if it is due."""
+
+        now = pygame.time.get_ticks()
+        if self.surface is None or now - self.last_refresh >= PROFILER_REFRESH_MS:
+            self.refresh()
+            self.last_refresh = now
+
+        self.display_surface.blit(self.surface, (self.left, self.top))
+
+
+profiler = Profiler()
@@ -0,0 +1,165 @@
+"""Contains the input recording and replay layer. A recording holds the seed
+of game_random.rng and the keys held during every simulation step, which is
+everything needed to play a session again exactly.
+
+Recordings are stored as a small header followed by run-length encoded
+steps: each run is a step count and the input mask shared by those steps.
+"""
+
+import struct
+from array import array
+
+import pygame
+
+from settings import *
+import controls
+from controls import KeyState
+
+
+# the keys the game logic reads, one bit each in an input mask
+RECORDED_KEYS = (
+    pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT,
+    pygame.K_SPACE, pygame.K_LCTRL, pygame.K_q, pygame.K_e,
+)
+# set when the upgrade menu was toggled before the step
+MENU_TOGGLE_BIT = 1 << len(RECORDED_KEYS)
+
+# magic, version, tick rate, seed, step count
+LOG_MAGIC = b"PRPL"
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct("<4sHHQI")
+# steps in the run, input mask
+LOG_RUN = struct.Struct("<HH")
+MAX_RUN = 0xFFFF
+
+
+def encode_input(pressed, menu_toggled):
+    """Pack the recorded keys of a key state and the menu toggle into a mask."""
+
+    mask = MENU_TOGGLE_BIT if menu_toggled else 0
+    for bit, key in enumerate(RECORDED_KEYS):
+        if pressed[key]:
+            mask |= 1 << bit
+
+    return mask
+
+
+def decode_input(mask):
+    """Unpack a mask into a key state and whether the menu was toggled."""
+
+    keys = [key for bit, key in enumerate(RECORDED_KEYS) if mask & (1 << bit)]
+
+    return (KeyState(keys), bool(mask & MENU_TOGGLE_BIT))
+
+
+class InputLog:
+    """The input mask of every simulation step of a session, and its seed."""
+
+    def __init__(self, seed, tick_rate=TICK_RATE):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.masks = array("H")
+
+    def __len__(self):
+        return len(self.masks)
+
+    def append(self, mask):
+        """Add the input of the next step."""
+
+        self.masks.append(mask)
+
+    def get_runs(self):
+        """Return the masks as a list of (step count, mask) runs."""
+
+        runs = []
+        for mask in self.masks:
+            if runs and runs[-1][1] == mask and runs[-1][0] < MAX_RUN:
+                runs[-1][0] += 1
+            else:
+                runs.append([1, mask])
+
+        return runs
+
+    def save(self, path):
+        """Write the log to a file."""
+
+        runs = self.get_runs()
+
+        with open(path, "wb") as log_file:
+            log_file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, self.tick_rate,
+                                           self.seed, len(self.masks)))
+            for count, mask in runs:
+                log_file.write(LOG_RUN.pack(count, mask))
+
+    @classmethod
+    def load(cls, path):
+        """Read a log written by save()."""
+
+        with open(path, "rb") as log_file:
+            data = log_file.read()
+
+        magic, version, tick_rate, seed, step_count = LOG_HEADER.unpack_from(data)
+        if magic != LOG_MAGIC or version != LOG_VERSION:
+            raise ValueError(f"{path} is not a version {LOG_VERSION} input recording")
+
+        log = cls(seed, tick_rate)
+        for count, mask in LOG_RUN.iter_unpack(data[LOG_HEADER.size:]):
+            log.masks.extend([mask] * count)
+
+        if len(log.masks) != step_count:
+            raise ValueError(f"{path} is truncated: {len(log.masks)} of {step_count} steps")
+
+        return log
+
+
+class InputRecorder:
+    """Captures the keyboard before every simulation step into an InputLog.
+    The game reads the captured state, so it sees exactly what is recorded.
+    """
+
+    def __init__(self, log):
+        self.log = log
+        self.key_state = KeyState()
+        self.menu_toggled = False
+
+        controls.set_source(lambda: self.key_state)
+
+    def toggle_menu(self):
+        """Note that the upgrade menu was toggled since the last step."""
+
+        self.menu_toggled = not self.menu_toggled
+
+    def capture(self):
+        """Record the input for the next simulation step."""
+
+        mask = encode_input(pygame.key.get_pressed(), self.menu_toggled)
+        self.log.append(mask)
+
+        self.key_state, _ = decode_input(mask)
+        self.menu_toggled = False
+
+
+class InputReplayer:
+    """Feeds the steps of an InputLog back into a level."""
+
+    def __init__(self, log, level):
+        self.log = log
+        self.level = level
+        self.step_index = 0
+        self.key_state = KeyState()
+
+        controls.set_source(lambda: self.key_state)
+
+    def finished(self):
+        """Return whether every recorded step has been played."""
+
+        return self.step_index >= len(self.log)
+
+    def advance(self):
+        """Apply the input of the next recorded step."""
+
+        self.key_state, menu_toggled = decode_input(self.log.masks[self.step_index])
+        self.step_index += 1
+
+        if menu_toggled:
+            self.level.toggle_menu()
@@ -1,7 +1,9 @@
 # general
 WIDTH         = 1280
 HEIGHT        = 720
-FPS           = 60
+FPS           = 60    # render cap, 0 renders as fast as possible
+TICK_RATE     = 60    # fixed simulation steps per second
+MAX_CATCHUP_STEPS = 5 # steps run before a render; past this the simulation slows
 TILESIZE      = 64
 HITBOX_OFFSET = {
     "player": -26,
@@ -9,6 +11,33 @@ HITBOX_OFFSET = {
     "grass": -10,
     "invisible": 0,
 }
+ASSET_WORKERS = 4     # threads decoding images at startup
+ATLAS_FRAMES  = True  # pack each animation set's frames into one atlas surface at startup
+ATLAS_CACHE   = "../cache/atlases"   # built atlases, rebuilt when a frame is newer
+ATLAS_MAX_WIDTH = 2048               # atlases wrap into a new shelf past this width
+
+# map
+map_layers = {
+    "boundary": "../map/map_FloorBlocks.csv",
+    "grass": "../map/map_Grass.csv",
+    "large_object": "../map/map_LargeObjects.csv",
+    "entities": "../map/map_Entities.csv",
+}
+COMPILED_MAP = "../map/map.bin"   # written by compile_map.py, used when newer than the csvs
+STREAM_WORLD = False   # only keep the map chunks around the player loaded
+STREAM_RADIUS = 2      # chunks loaded around the player's chunk; keep STREAM_RADIUS * CHUNK_SIZE above ENEMY_ACTIVATION_RADIUS
+STREAM_CHUNKS_PER_STEP = 2   # most chunks built into sprites in one simulation step
+
+# camera
+CHUNK_SIZE        = TILESIZE * 8
+BAKE_STATIC_LAYER = False       # pre-composite the floor and flat tiles into chunks
+BAKED_TILE_TYPES  = ["grass"]   # tiles drawn into the baked layer instead of y-sorted
+# baked tiles always draw under every sprite: with grass baked, the player and
+# enemies walk over grass that would otherwise cover their feet
+
+# profiler
+PROFILER_HISTORY    = 240   # frames of timings kept for the profiler overlay (F3)
+PROFILER_REFRESH_MS = 250   # how often the overlay's text and graph are redrawn
 
 # ui
 BAR_HEIGHT       = 20
@@ -17,12 +46,14 @@ ENERGY_BAR_WIDTH = 140
 ITEM_BOX_SIZE    = 80
 UI_FONT          = "../graphics/font/joystix.ttf"
 UI_FONT_SIZE     = 18
+TEXT_CACHE_SIZE  = 256   # rendered text surfaces kept by the text cache
 
 # general colors
 WATER_COLOR     = "#71DDEE"
 UI_BG_COLOR     = "#222222"
 UI_BORDER_COLOR = "#111111"
 TEXT_COLOR      = "#EEEEEE"
+HUD_COLORKEY    = "#FF00FF"   # never drawn by the HUD, transparent in its overlay
 
 # ui colors
 HEALTH_COLOR           = "red"
@@ -35,6 +66,19 @@ BAR_COLOR                 = "#EEEEEE"
 BAR_COLOR_SELECTED        = "#111111"
 UPGRADE_BG_COLOR_SELECTED = "#EEEEEE"
 
+# sounds
+sound_data = {
+    "death": {"path": "../audio/death.wav", "volume": 0.3},
+    "hit": {"path": "../audio/hit.wav", "volume": 0.3},
+    "slash": {"path": "../audio/attack/slash.wav", "volume": 0.3},
+    "claw": {"path": "../audio/attack/claw.wav", "volume": 0.3},
+    "fireball": {"path": "../audio/attack/fireball.wav", "volume": 0.3},
+    "sword": {"path": "../audio/sword.wav", "volume": 0.4},
+    "heal": {"path": "../audio/heal.wav", "volume": 0.4},
+    "flame": {"path": "../audio/flame.wav", "volume": 0.4},
+    "music": {"path": "../audio/main.ogg", "volume": 0.5},
+}
+
 # weapons
 weapon_data = {
     "sword": {"cooldown": 100, "damage": 15, "graphic": "../graphics/weapons/sword/full.png"},
@@ -43,6 +87,7 @@ weapon_data = {
     "rapier": {"cooldown": 50, "damage": 8, "graphic": "../graphics/weapons/rapier/full.png"},
     "sai": {"cooldown": 80, "damage": 10, "graphic": "../graphics/weapons/sai/full.png"},
 }
+REUSE_WEAPON_SPRITE = False   # keep one Weapon sprite around instead of one per attack
 
 # magic
 magic_data = {
@@ -51,9 +96,11 @@ magic_data = {
 }
 
 # enemies
+ENEMY_ACTIVATION_RADIUS = 800   # enemies further than this from the player sleep
+BATCHED_ENEMY_AI = False   # run the enemy AI for every enemy at once with numpy (if installed)
 monster_data = {
-	"squid": {"health": 100,"exp":100,"damage":20,"attack_type": "slash", "attack_sound":"../audio/attack/slash.wav", "speed": 3, "resistance": 3, "attack_radius": 80, "notice_radius": 360},
-	"raccoon": {"health": 300,"exp":250,"damage":40,"attack_type": "claw",  "attack_sound":"../audio/attack/claw.wav","speed": 2, "resistance": 3, "attack_radius": 120, "notice_radius": 400},
-	"spirit": {"health": 100,"exp":110,"damage":8,"attack_type": "thunder", "attack_sound":"../audio/attack/fireball.wav", "speed": 4, "resistance": 3, "attack_radius": 60, "notice_radius": 350},
-	"bamboo": {"health": 70,"exp":120,"damage":6,"attack_type": "leaf_attack", "attack_sound":"../audio/attack/slash.wav", "speed": 3, "resistance": 3, "attack_radius": 50, "notice_radius": 300}
+	"squid": {"health": 100,"exp":100,"damage":20,"attack_type": "slash", "attack_sound":"slash", "speed": 3, "resistance": 3, "attack_radius": 80, "notice_radius": 360},
+	"raccoon": {"health": 300,"exp":250,"damage":40,"attack_type": "claw",  "attack_sound":"claw","speed": 2, "resistance": 3, "attack_radius": 120, "notice_radius": 400},
+	"spirit": {"health": 100,"exp":110,"damage":8,"attack_type": "thunder", "attack_sound":"fireball", "speed": 4, "resistance": 3, "attack_radius": 60, "notice_radius": 350},
+	"bamboo": {"health": 70,"exp":120,"damage":6,"attack_type": "leaf_attack", "attack_sound":"slash", "speed": 3, "resistance": 3, "attack_radius": 50, "notice_radius": 300}
 }
\ No newline at end of file
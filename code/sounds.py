@@ -0,0 +1,60 @@
+"""Contains the sound bank, which decodes every sound once and shares it with
+the rest of the game.
+"""
+
+import pygame
+
+from settings import *
+
+
+class SilentSound:
+    """Stands in for a pygame Sound when the bank is disabled."""
+
+    def play(self, *args, **kwargs):
+        pass
+
+    def stop(self):
+        pass
+
+    def set_volume(self, value):
+        pass
+
+
+class SoundBank:
+    """Every sound in the game, decoded once and shared by all entities."""
+
+    def __init__(self):
+        self.sounds = {}
+        self.enabled = True
+
+    def disable(self):
+        """Hand out silent sounds from now on, without touching the mixer.
+        Used when running without an audio device.
+        """
+
+        self.enabled = False
+        self.sounds = {name: SilentSound() for name in sound_data.keys()}
+
+    def load(self):
+        """Decode every sound listed in sound_data and apply its volume."""
+
+        if not self.enabled:
+            return
+
+        for name, info in sound_data.items():
+            if name not in self.sounds:
+                sound = pygame.mixer.Sound(info["path"])
+                sound.set_volume(info["volume"])
+                self.sounds[name] = sound
+
+    def get(self, name):
+        """Return a shared sound by name, loading the bank if needed."""
+
+        if name not in self.sounds:
+            self.load()
+
+        return self.sounds[name]
+
+
+# the bank every entity references
+sound_bank = SoundBank()
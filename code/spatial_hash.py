@@ -0,0 +1,106 @@
+"""Contains a sprite group which indexes its sprites in a uniform grid, so
+sprites can be looked up by area instead of by scanning the whole group.
+"""
+
+import pygame
+
+from settings import *
+
+
+class SpatialHashGroup(pygame.sprite.Group):
+    """A sprite group which buckets each sprite into the grid cells its
+    hitbox overlaps.
+    """
+
+    def __init__(self, cell_size=TILESIZE, rect_attr="hitbox"):
+        # initialize parent class
+        super().__init__()
+
+        self.cell_size = cell_size
+        self.rect_attr = rect_attr
+
+        # cell key -> sprites in that cell (dicts keep insertion order)
+        self.cells = {}
+        # sprite -> cell keys it was filed under, and their bounds
+        self.sprite_cells = {}
+        self.sprite_bounds = {}
+        # sprite -> serial number, so query results can be put back in the
+        # order their sprites were added to the group
+        self.add_order = {}
+        self.add_count = 0
+
+    def get_cell_bounds(self, rect):
+        """Return the first and last cell columns and rows the rect overlaps."""
+
+        size = self.cell_size
+
+        return (
+            rect.left // size,
+            rect.top // size,
+            max(rect.right - 1, rect.left) // size,
+            max(rect.bottom - 1, rect.top) // size,
+        )
+
+    def get_cell_keys(self, rect):
+        """Return the keys of every grid cell the rect overlaps."""
+
+        left, top, right, bottom = self.get_cell_bounds(rect)
+
+        return [(x, y) for y in range(top, bottom + 1) for x in range(left, right + 1)]
+
+    def add_internal(self, sprite, layer=None):
+        """Add a sprite to the group and file it in the grid."""
+
+        super().add_internal(sprite, layer)
+
+        self.add_order[sprite] = self.add_count
+        self.add_count += 1
+        self.file_sprite(sprite)
+
+    def remove_internal(self, sprite):
+        """Remove a sprite from the group and from the grid."""
+
+        super().remove_internal(sprite)
+
+        del self.add_order[sprite]
+        self.unfile_sprite(sprite)
+
+    def file_sprite(self, sprite):
+        """File a sprite in every cell its hitbox overlaps."""
+
+        rect = getattr(sprite, self.rect_attr)
+        keys = self.get_cell_keys(rect)
+        for key in keys:
+            self.cells.setdefault(key, {})[sprite] = None
+        self.sprite_cells[sprite] = keys
+        self.sprite_bounds[sprite] = self.get_cell_bounds(rect)
+
+    def unfile_sprite(self, sprite):
+        """Take a sprite out of the cells it was filed in."""
+
+        for key in self.sprite_cells.pop(sprite):
+            cell = self.cells[key]
+            del cell[sprite]
+            if not cell:
+                del self.cells[key]
+        del self.sprite_bounds[sprite]
+
+    def update_sprite(self, sprite):
+        """Re-file a sprite that has moved, if it changed cells."""
+
+        bounds = self.get_cell_bounds(getattr(sprite, self.rect_attr))
+        if bounds != self.sprite_bounds[sprite]:
+            self.unfile_sprite(sprite)
+            self.file_sprite(sprite)
+
+    def query(self, rect):
+        """Return the sprites filed in any cell the rect overlaps."""
+
+        found = {}
+
+        for key in self.get_cell_keys(rect):
+            cell = self.cells.get(key)
+            if cell:
+                found.update(cell)
+
+        return found
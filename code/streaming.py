@@ -0,0 +1,296 @@
+"""Contains the world streamer, which keeps only the part of the map around
+the player in memory:
+
+MapSource: random access to the map's layers, one chunk at a time
+WorldStreamer: loads and unloads the chunks around the player as it moves
+"""
+
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from settings import *
+from support import *
+
+
+# the player's value in the entities layer
+PLAYER_CELL = 394
+
+
+class MapSource:
+    """The map's layers as flat arrays of cell values (-1 for empty cells).
+    The compiled map is memory-mapped, so only the pages of the chunks read
+    are ever loaded; the csvs have to be read whole.
+    """
+
+    def __init__(self):
+        if compiled_map_is_current(COMPILED_MAP, map_layers.values()):
+            self.width, layers = import_compiled_map(COMPILED_MAP)
+            self.layers = {style: values for style, (values, _) in layers.items()}
+            self.height = len(next(iter(self.layers.values()))) // self.width
+            return
+
+        layouts = {style: import_csv_layout(path) for style, path in map_layers.items()}
+        self.width = max(len(row) for layout in layouts.values() for row in layout)
+        self.height = max(len(layout) for layout in layouts.values())
+
+        self.layers = {}
+        for style, layout in layouts.items():
+            values = array("h", [-1]) * (self.width * self.height)
+            for row_i, row in enumerate(layout):
+                for col_i, col in enumerate(row):
+                    if col != "-1":
+                        values[row_i * self.width + col_i] = int(col)
+            self.layers[style] = values
+
+    def find(self, style, value):
+        """Return the index of the first cell of a layer holding value."""
+
+        values = self.layers[style]
+        for index in range(len(values)):
+            if values[index] == value:
+                return index
+
+        return None
+
+    def decode_chunk(self, key):
+        """Return the (style, index, value) of every non-empty cell of a
+        chunk. Only reads the map, so it is safe to run on a worker thread.
+        """
+
+        cells_per_chunk = CHUNK_SIZE // TILESIZE
+        left = key[0] * cells_per_chunk
+        top = key[1] * cells_per_chunk
+        right = min(left + cells_per_chunk, self.width)
+        bottom = min(top + cells_per_chunk, self.height)
+
+        cells = []
+        for style, values in self.layers.items():
+            for row_i in range(top, bottom):
+                for index in range(row_i * self.width + left, row_i * self.width + right):
+                    value = values[index]
+                    if value != -1:
+                        cells.append((style, index, value))
+
+        return cells
+
+
+class WorldStreamer:
+    """Materializes the map chunks within STREAM_RADIUS chunks of the player
+    (tiles, grass, enemies and their obstacles) and unloads the ones further
+    away. Every chunk in range, and one ring further out, is decoded on a
+    worker thread. The decoded chunks are built into sprites from a queue,
+    nearest first, at most STREAM_CHUNKS_PER_STEP per step, so crossing a
+    chunk border never stalls a frame. A chunk whose decode isn't done yet
+    is tried again next step.
+
+    What happened to a chunk's cells is kept when it is unloaded: cut grass
+    and killed enemies stay gone, living enemies come back where they were,
+    and grass keeps the image it was first given. Enemies belong to the
+    chunk they are in, not the one they spawned in, so one following the
+    player stays loaded.
+
+    When deterministic is set (recording or replaying a session), a chunk
+    whose decode isn't done is decoded on the spot instead of waiting a
+    step, so when chunks load doesn't depend on the worker's timing.
+
+    The worker thread is stopped by shutdown(), when the level is done.
+    """
+
+    def __init__(self, level, source):
+        self.level = level
+        self.source = source
+        self.radius = STREAM_RADIUS
+
+        cells_per_chunk = CHUNK_SIZE // TILESIZE
+        self.chunk_columns = -(-source.width // cells_per_chunk)
+        self.chunk_rows = -(-source.height // cells_per_chunk)
+
+        # chunk key -> decoded cells, in flight or done
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk-decoder")
+        self.pending = {}
+
+        # keys of the chunks in range still to be built, nearest first
+        self.load_queue = []
+        self.deterministic = False
+
+        # chunk key -> {(style, index): sprite} for every loaded chunk
+        self.loaded = {}
+
+        # living enemies, and every enemy cell that was ever created (so
+        # reloading its spawn chunk never creates an enemy twice)
+        self.enemies = {}           # (style, index) -> enemy
+        self.spawned_enemies = {}   # (style, index) -> None
+
+        # persistent state of the cells of unloaded chunks
+        self.removed_cells = {}   # (style, index) -> None, for cut grass
+        self.enemy_states = {}    # chunk key -> {(style, index): (topleft, health)} of living enemies in it
+        self.grass_images = {}    # (style, index) -> image picked for a grass cell
+
+        self.center = None
+
+    def create_player(self):
+        """Create the player where the map places them."""
+
+        index = self.source.find("entities", PLAYER_CELL)
+        row_i, col_i = divmod(index, self.source.width)
+
+        self.player_cell = ("entities", index)
+        self.level.create_cell("entities", PLAYER_CELL, col_i * TILESIZE, row_i * TILESIZE)
+
+    def get_chunks_around(self, center, radius):
+        """Return the keys of the chunks within radius of a chunk, nearest
+        first (so the chunk the player is in is always loaded first).
+        """
+
+        center_x, center_y = center
+        keys = [
+            (chunk_x, chunk_y)
+            for chunk_y in range(max(center_y - radius, 0), min(center_y + radius + 1, self.chunk_rows))
+            for chunk_x in range(max(center_x - radius, 0), min(center_x + radius + 1, self.chunk_columns))
+        ]
+        keys.sort(key=lambda key: (max(abs(key[0] - center_x), abs(key[1] - center_y)), key))
+
+        return keys
+
+    def get_chunk_key(self, pos):
+        """Return the key of the chunk a position is in."""
+
+        return (pos[0] // CHUNK_SIZE, pos[1] // CHUNK_SIZE)
+
+    def load_chunk(self, key):
+        """Create the sprites of a chunk, decoding it now if the worker
+        hasn't finished it yet, and bring back the enemies left in it.
+        """
+
+        future = self.pending.pop(key, None)
+        if future and future.done():
+            cells = future.result()
+        else:
+            if future:
+                future.cancel()
+            cells = self.source.decode_chunk(key)
+
+        width = self.source.width
+        sprites = {}
+
+        for style, index, value in cells:
+            cell = (style, index)
+            if cell in self.removed_cells or cell in self.spawned_enemies or cell == self.player_cell:
+                continue
+
+            row_i, col_i = divmod(index, width)
+            sprite = self.level.create_cell(style, value, col_i * TILESIZE, row_i * TILESIZE,
+                                            self.grass_images.get(cell))
+
+            if sprite.sprite_type == "enemy":
+                self.spawned_enemies[cell] = None
+                self.enemies[cell] = sprite
+                continue
+
+            if style == "grass":
+                self.grass_images[cell] = sprite.image
+            sprites[cell] = sprite
+
+        self.loaded[key] = sprites
+
+        entities = self.source.layers["entities"]
+        for cell, (topleft, health) in self.enemy_states.pop(key, {}).items():
+            enemy = self.level.create_cell("entities", entities[cell[1]], *topleft)
+            enemy.health = health
+            self.enemies[cell] = enemy
+
+    def unload_chunk(self, key):
+        """Remove the tiles of a chunk, remembering which grass was cut."""
+
+        for cell, sprite in self.loaded.pop(key).items():
+            if sprite.alive():
+                sprite.kill()
+            else:
+                self.removed_cells[cell] = None
+
+    def unload_enemies(self):
+        """Unload the living enemies that are outside the loaded and queued
+        chunks, filing each under the chunk it is in now.
+        """
+
+        kept = dict.fromkeys(self.load_queue)
+
+        for cell, enemy in list(self.enemies.items()):
+            # killed enemies stay in spawned_enemies, so they never come back
+            if not enemy.alive():
+                del self.enemies[cell]
+                continue
+
+            key = self.get_chunk_key(enemy.rect.center)
+            if key not in self.loaded and key not in kept:
+                self.enemy_states.setdefault(key, {})[cell] = (enemy.rect.topleft, enemy.health)
+                enemy.kill()
+                del self.enemies[cell]
+
+    def retarget(self, center):
+        """Queue the chunks around a new center chunk, decode them and the
+        next ring ahead of time, and drop the chunks out of range.
+        """
+
+        wanted = self.get_chunks_around(center, self.radius)
+        prefetch = self.get_chunks_around(center, self.radius + 1)
+
+        for key in prefetch:
+            if key not in self.loaded and key not in self.pending:
+                self.pending[key] = self.executor.submit(self.source.decode_chunk, key)
+        self.load_queue = [key for key in wanted if key not in self.loaded]
+
+        in_range = dict.fromkeys(prefetch)
+        for key in [key for key in self.loaded if key not in in_range]:
+            self.unload_chunk(key)
+        for key in [key for key in self.pending if key not in in_range]:
+            self.pending.pop(key).cancel()
+        self.unload_enemies()
+
+    def load_queued(self):
+        """Build up to STREAM_CHUNKS_PER_STEP queued chunks, nearest first,
+        skipping the ones still being decoded.
+        """
+
+        loaded = 0
+        for key in list(self.load_queue):
+            if loaded == STREAM_CHUNKS_PER_STEP:
+                break
+
+            future = self.pending.get(key)
+            if future and not future.done() and not self.deterministic:
+                continue
+
+            self.load_queue.remove(key)
+            self.load_chunk(key)
+            loaded += 1
+
+    def update(self):
+        """Retarget the chunks when the player changes chunk, and build the
+        queued ones that are due.
+        """
+
+        center = self.get_chunk_key(self.level.player.rect.center)
+        if center != self.center:
+            self.center = center
+            self.retarget(center)
+
+        if self.load_queue:
+            self.load_queued()
+
+    def shutdown(self):
+        """Stop the worker thread, dropping the decodes not yet started."""
+
+        self.executor.shutdown(cancel_futures=True)
+        self.pending.clear()
+
+    def start(self):
+        """Create the player and load every chunk around them (the level is
+        still being built, so no frame is waiting).
+        """
+
+        self.create_player()
+        self.update()
+
+        while self.load_queue:
+            self.load_chunk(self.load_queue.pop(0))
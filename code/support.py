@@ -1,7 +1,11 @@
 """Utility functions for use throughout the source code."""
 
 
-from os import walk
+import sys
+import mmap
+import struct
+from array import array
+from os import walk, path as os_path
 from csv import reader
 
 import pygame
@@ -17,18 +21,208 @@ def import_csv_layout(path):
     return terrain_map        
 
 
+# compiled map layout: a header, one entry per layer, then for each layer a
+# dense int16 array of every cell and an int32 array of its non-empty cells
+MAP_MAGIC = b"PYRPGMAP"
+MAP_VERSION = 1
+MAP_HEADER = struct.Struct("<8sHHHH")
+MAP_LAYER_ENTRY = struct.Struct("<16sIII")
+
+
+def compiled_map_is_current(map_path, csv_paths):
+    """Check that a compiled map exists and is newer than all of its csvs."""
+
+    if not os_path.exists(map_path):
+        return False
+
+    map_time = os_path.getmtime(map_path)
+
+    return all(os_path.getmtime(csv_path) <= map_time for csv_path in csv_paths)
+
+
+def import_compiled_map(path):
+    """Memory-map a compiled map. Return the map width and, for each layer,
+    its cell values and the indices of its non-empty cells.
+    """
+
+    with open(path, "rb") as map_file:
+        data = mmap.mmap(map_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, width, height, layer_count = MAP_HEADER.unpack_from(data, 0)
+    if magic != MAP_MAGIC or version != MAP_VERSION:
+        raise ValueError(f"{path} is not a version {MAP_VERSION} compiled map")
+
+    view = memoryview(data)
+    layers = {}
+
+    for layer_i in range(layer_count):
+        entry_offset = MAP_HEADER.size + layer_i * MAP_LAYER_ENTRY.size
+        name, values_offset, cells_offset, cell_count = MAP_LAYER_ENTRY.unpack_from(data, entry_offset)
+
+        values = view[values_offset:values_offset + width * height * 2]
+        cells = view[cells_offset:cells_offset + cell_count * 4]
+
+        if sys.byteorder == "little":
+            values = values.cast("h")
+            cells = cells.cast("i")
+        else:
+            # the file is little endian, so swap into a copy
+            values = array_from_little_endian("h", values)
+            cells = array_from_little_endian("i", cells)
+
+        layers[name.rstrip(b"\0").decode()] = (values, cells)
+
+    return width, layers
+
+
+def array_from_little_endian(typecode, data):
+    """Copy little endian data into a native array."""
+
+    values = array(typecode, bytes(data))
+    values.byteswap()
+
+    return values
+
+
+def list_folder(path):
+    """Return the paths of all images in a folder, in the order
+    import_folder loads them.
+    """
+
+    return [f"{path}/{image}" for _, __, img_files in walk(path) for image in img_files]
+
+
 def import_folder(path):
     """Import all images from a folder into pygame."""
 
     surface_list = []
 
-    for _, __, img_files in walk(path):
-        for image in img_files:
-            full_path = f"{path}/{image}"
+    for full_path in list_folder(path):
+        image_surf = pygame.image.load(full_path).convert_alpha()
 
-            image_surf = pygame.image.load(full_path)
-            image_surf.convert_alpha()
-
-            surface_list.append(image_surf)
+        surface_list.append(image_surf)
 
     return surface_list
+
+
+# fully transparent surfaces, shared by every flash frame of a size
+transparent_surfaces = {}
+
+
+def create_flash_frames(frames):
+    """Return the hit-flash variant of each frame: a fully transparent
+    surface of the same size, so a flickering sprite switches frames instead
+    of changing surface alpha. Every flash frame draws nothing, so frames of
+    a size share one surface rather than each getting a faded out copy.
+    """
+
+    flash_frames = []
+
+    for frame in frames:
+        size = frame.get_size()
+        flash_surf = transparent_surfaces.get(size)
+
+        if flash_surf is None:
+            flash_surf = pygame.Surface(size, pygame.SRCALPHA)
+            transparent_surfaces[size] = flash_surf
+
+        flash_frames.append(flash_surf)
+
+    return flash_frames
+
+
+# decoded folders shared by every caller: path -> list of frames
+folder_cache = {}
+
+
+def import_folder_cached(path):
+    """Import all images from a folder, decoding each folder only once per
+    process. The returned list is shared and must not be modified.
+    """
+
+    frames = folder_cache.get(path)
+
+    if frames is None:
+        frames = import_folder(path)
+        folder_cache[path] = frames
+
+    return frames
+
+
+# decoded single images shared by every caller: path -> surface
+image_cache = {}
+
+
+def load_image_cached(path, alpha=True):
+    """Load an image converted to the display format (with per-pixel alpha
+    unless alpha is False), decoding it only once per process. The returned
+    surface is shared and must not be modified.
+    """
+
+    image = image_cache.get(path)
+
+    if image is None:
+        image = pygame.image.load(path)
+        image = image.convert_alpha() if alpha else image.convert()
+        image_cache[path] = image
+
+    return image
+
+
+# hit-flash variants of cached folders: path -> list of frames
+flash_cache = {}
+
+
+def import_flash_frames_cached(path):
+    """Return the hit-flash variants of a cached folder's frames, created
+    once per process and shared like the folder itself.
+    """
+
+    flash_frames = flash_cache.get(path)
+
+    if flash_frames is None:
+        flash_frames = create_flash_frames(import_folder_cached(path))
+        flash_cache[path] = flash_frames
+
+    return flash_frames
+
+
+# every loaded texture atlas: atlas set -> TextureAtlas (see atlas.py).
+# Their frames are subsurfaces sharing the atlas pixels.
+atlases = {}
+
+
+def cached_bytes():
+    """Return the number of pixel bytes held by the image caches. Frames cut
+    from an atlas share its pixels, so each atlas is counted once, whole.
+    """
+
+    surfaces = {}
+    for cache in (folder_cache, flash_cache):
+        for frames in cache.values():
+            for frame in frames:
+                surfaces[frame.get_abs_parent()] = None
+    for image in image_cache.values():
+        surfaces[image.get_abs_parent()] = None
+
+    return sum(surface.get_width() * surface.get_height() * surface.get_bytesize() for surface in surfaces)
+
+
+def evict_folder(path=None):
+    """Drop a folder, or a single image loaded by load_image_cached, from
+    the caches, or everything if no path is given. The atlas a folder was
+    packed into is dropped with it, so its pixels are freed once no other
+    cached folder uses them.
+    """
+
+    if path is None:
+        folder_cache.clear()
+        flash_cache.clear()
+        image_cache.clear()
+        atlases.clear()
+    else:
+        folder_cache.pop(path, None)
+        flash_cache.pop(path, None)
+        image_cache.pop(path, None)
+        for atlas_set in [atlas_set for atlas_set, atlas in atlases.items() if path in atlas.frame_rects]:
+            del atlases[atlas_set]
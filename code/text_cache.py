@@ -0,0 +1,87 @@
+"""Contains caches for rendered text, so the HUD and menus don't call
+font.render for the same text every frame:
+
+TextCache: rendered text surfaces, with the least recently used evicted
+DigitAtlas: pre-rendered digit glyphs, composed into numbers when drawn
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+from settings import *
+
+
+class TextCache:
+    """Rendered text surfaces keyed on (font, text, color, antialias). Holds
+    at most capacity surfaces, dropping the least recently used first.
+    """
+
+    def __init__(self, capacity=TEXT_CACHE_SIZE):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        """Return the text rendered like font.render(text, antialias, color)."""
+
+        key = (font, text, color, antialias)
+
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+
+        return surf
+
+    def clear(self):
+        """Drop every cached surface."""
+
+        self.surfaces.clear()
+
+
+class DigitAtlas:
+    """The digit glyphs of a font in one color, rendered once. Numbers are
+    drawn glyph by glyph, without rendering any text.
+    """
+
+    def __init__(self, font, antialias, color, characters="0123456789-"):
+        self.glyphs = {char: font.render(char, antialias, color) for char in characters}
+        self.advances = {char: font.size(char)[0] for char in characters}
+        self.height = font.get_height()
+
+    def get_rect(self, number, **kwargs):
+        """Return the rect the number would be drawn in, positioned by kwargs
+        like Surface.get_rect().
+        """
+
+        width = sum(self.advances[char] for char in str(number))
+        rect = pygame.Rect(0, 0, width, self.height)
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+
+        return rect
+
+    def draw(self, surface, number, pos):
+        """Draw the number with its top-left at pos."""
+
+        x, y = pos
+        glyphs = self.glyphs
+        advances = self.advances
+
+        for char in str(number):
+            surface.blit(glyphs[char], (x, y))
+            x += advances[char]
+
+
+# shared by the HUD and the upgrade menu
+text_cache = TextCache()
@@ -9,8 +9,9 @@ class Tile(pygame.sprite.Sprite):
 
     def __init__(self, pos, group, sprite_type, 
                  surface=pygame.Surface((TILESIZE,TILESIZE))):
-        # initialize parent Sprite class
-        super().__init__(group)
+        # initialize parent Sprite class (groups are joined once the hitbox
+        # exists, so spatially indexed groups can file the tile)
+        super().__init__()
 
         self.sprite_type = sprite_type
 
@@ -26,3 +27,5 @@ class Tile(pygame.sprite.Sprite):
         # custom hit box
         y_offset = HITBOX_OFFSET[sprite_type]
         self.hitbox = self.rect.inflate(0, y_offset)
+
+        self.add(group)
@@ -2,6 +2,8 @@
 
 import pygame
 from settings import *
+from support import load_image_cached
+from text_cache import DigitAtlas
 
 class UI:
     """The UI, or HUD."""
@@ -11,6 +13,7 @@ class UI:
         # general
         self.display_surface = pygame.display.get_surface()
         self.font = pygame.font.Font(UI_FONT, UI_FONT_SIZE)
+        self.exp_digits = DigitAtlas(self.font, False, TEXT_COLOR)
 
         # bar setup
         self.health_bar_rect = pygame.Rect(10, 10, HEALTH_BAR_WIDTH, BAR_HEIGHT)
@@ -20,59 +23,73 @@ class UI:
         self.weapon_graphics = []
         for weapon in weapon_data.values():
             path = weapon["graphic"]
-            weapon_img = pygame.image.load(path).convert_alpha()
+            weapon_img = load_image_cached(path)
             self.weapon_graphics.append(weapon_img)
 
         # spell assets
         self.spell_graphics = []
         for spell in magic_data.values():
             path = spell["graphic"]
-            spell_img = pygame.image.load(path).convert_alpha()
+            spell_img = load_image_cached(path)
             self.spell_graphics.append(spell_img)
 
+        # the HUD is split into panels (bars, exp, selection boxes). A panel
+        # is only redrawn on the canvas when what it shows changes, then
+        # copied out with its unpainted pixels colorkeyed. Every frame all
+        # the panels are blitted in one call.
+        self.canvas = pygame.Surface(self.display_surface.get_size()).convert()
+        self.canvas.fill(HUD_COLORKEY)
+        self.panels = {}         # name -> (surface, position)
+        self.panel_states = {}   # name -> state the panel was drawn in
+        self.panel_blits = []
+        self.rebuild_count = 0
 
-    def show_bar(self, current, max, bg_rect, color):
+    def get_bar_width(self, current, max, bg_rect):
+        """Convert a stat to the width of its bar in pixels."""
+
+        return round(bg_rect.width * current / max)
+
+    def show_bar(self, current_width, bg_rect, color):
         """Create and display a UI bar."""
 
         # draw bg bar
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, bg_rect)
-
-        # convert stat to pixel
-        ratio = current / max
-        current_width = bg_rect.width * ratio
+        pygame.draw.rect(self.canvas, UI_BG_COLOR, bg_rect)
 
         # draw "current" stat bar
         current_rect = bg_rect.copy()
         current_rect.width = current_width
-        pygame.draw.rect(self.display_surface, color, current_rect)
+        pygame.draw.rect(self.canvas, color, current_rect)
 
         # draw a border around the bar
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, bg_rect, 3)
+        pygame.draw.rect(self.canvas, UI_BORDER_COLOR, bg_rect, 3)
+
+        return bg_rect
 
     def show_exp(self, exp):
         """Display the current player exp."""
 
-        text_surf = self.font.render(str(int(exp)), False, TEXT_COLOR)
-        txt_x, txt_y = self.display_surface.get_size()
-        text_rect = text_surf.get_rect(bottomright=(txt_x - 20, txt_y - 20))
+        txt_x, txt_y = self.canvas.get_size()
+        text_rect = self.exp_digits.get_rect(int(exp), bottomright=(txt_x - 20, txt_y - 20))
 
         # background
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, text_rect.inflate(20, 20))
+        pygame.draw.rect(self.canvas, UI_BG_COLOR, text_rect.inflate(20, 20))
         # exp text
-        self.display_surface.blit(text_surf, text_rect)
+        self.exp_digits.draw(self.canvas, int(exp), text_rect.topleft)
         # frame
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, text_rect.inflate(20, 20), 3)
+        pygame.draw.rect(self.canvas, UI_BORDER_COLOR, text_rect.inflate(20, 20), 3)
+
+        return text_rect.inflate(20, 20)
 
     def show_selection_box(self, left, top, has_switched):
         """Display a weapon or magic selection box."""
 
         # draw selection box
         bg_rect = pygame.Rect(left, top, ITEM_BOX_SIZE, ITEM_BOX_SIZE)
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, bg_rect)
+        pygame.draw.rect(self.canvas, UI_BG_COLOR, bg_rect)
 
         # draw border
         border_clr = UI_BORDER_COLOR_ACTIVE if has_switched else UI_BORDER_COLOR
-        pygame.draw.rect(self.display_surface, border_clr, bg_rect, 3)
+        pygame.draw.rect(self.canvas, border_clr, bg_rect, 3)
 
         return bg_rect
 
@@ -86,7 +103,9 @@ class UI:
         weapon_rect = weapon_surf.get_rect(center=bg_rect.center)
 
         # draw the weapon inside the selection box
-        self.display_surface.blit(weapon_surf, weapon_rect)
+        self.canvas.blit(weapon_surf, weapon_rect)
+
+        return bg_rect
 
     def show_magic_overlay(self, spell_index, has_switched):
         """Manage the display of a weapon in a selection box."""
@@ -98,23 +117,61 @@ class UI:
         spell_rect = spell_surf.get_rect(center=bg_rect.center)
 
         # draw the spell inside the selection box
-        self.display_surface.blit(spell_surf, spell_rect)
+        self.canvas.blit(spell_surf, spell_rect)
+
+        return bg_rect
+
+    def get_panel_states(self, player):
+        """Return what each HUD panel shows, as it is drawn."""
+
+        return {
+            "bars": (
+                self.get_bar_width(player.health, player.stats["health"], self.health_bar_rect),
+                self.get_bar_width(player.energy, player.stats["energy"], self.energy_bar_rect),
+            ),
+            "exp": int(player.exp),
+            "selection": (
+                player.weapon_index, not player.can_switch_weapon,
+                player.spell_index, not player.can_switch_spell,
+            ),
+        }
+
+    def rebuild_panel(self, name, state):
+        """Redraw a HUD panel on the canvas and copy it out."""
+
+        if name == "bars":
+            health_width, energy_width = state
+            # health bar
+            area = self.show_bar(health_width, self.health_bar_rect, HEALTH_COLOR)
+            # energy bar
+            area = area.union(self.show_bar(energy_width, self.energy_bar_rect, ENERGY_COLOR))
+        elif name == "exp":
+            # experience
+            area = self.show_exp(state)
+        else:
+            weapon_index, weapon_switched, spell_index, spell_switched = state
+            # weapon selection
+            area = self.show_weapon_overlay(weapon_index, weapon_switched)
+            # magic selection
+            area = area.union(self.show_magic_overlay(spell_index, spell_switched))
+
+        panel = self.canvas.subsurface(area).copy()
+        panel.set_colorkey(HUD_COLORKEY, pygame.RLEACCEL)
+
+        self.panels[name] = (panel, area.topleft)
+        self.panel_states[name] = state
+        self.rebuild_count += 1
 
     def display(self, player):
         """Display player stats to the screen."""
-        
-        # health bar
-        self.show_bar(player.health, player.stats["health"],
-                      self.health_bar_rect, HEALTH_COLOR)
 
-        # energy bar
-        self.show_bar(player.energy, player.stats["energy"],
-                      self.energy_bar_rect, ENERGY_COLOR)
-        
-        # experience
-        self.show_exp(player.exp)
+        rebuilt = False
+        for name, state in self.get_panel_states(player).items():
+            if state != self.panel_states.get(name):
+                self.rebuild_panel(name, state)
+                rebuilt = True
+
+        if rebuilt:
+            self.panel_blits = list(self.panels.values())
 
-        # weapon selection
-        self.show_weapon_overlay(player.weapon_index, not player.can_switch_weapon)
-        # magic selection
-        self.show_magic_overlay(player.spell_index, not player.can_switch_spell)
+        self.display_surface.blits(self.panel_blits, False)
@@ -4,6 +4,9 @@
 import pygame
 
 from settings import *
+import game_clock
+import controls
+from text_cache import text_cache
 
 
 class UpgradeMenu:
@@ -37,21 +40,21 @@ class UpgradeMenu:
     def get_input(self):
         """Get and handle input from the player."""
 
-        keys = pygame.key.get_pressed()
+        keys = controls.get_pressed()
 
         if self.can_move:
             if keys[pygame.K_RIGHT] and self.selection_index < self.attibute_num - 1:
                 self.selection_index += 1
                 self.can_move = False
-                self.selection_time = pygame.time.get_ticks()
+                self.selection_time = game_clock.get_ticks()
             elif keys[pygame.K_LEFT] and self.selection_index >= 1:
                 self.selection_index -= 1
                 self.can_move = False
-                self.selection_time = pygame.time.get_ticks()
+                self.selection_time = game_clock.get_ticks()
 
             if keys[pygame.K_SPACE]:
                 self.can_move = False
-                self.selection_time = pygame.time.get_ticks()
+                self.selection_time = game_clock.get_ticks()
                 
                 self.item_list[self.selection_index].boost_stat(self.player)
 
@@ -59,7 +62,7 @@ class UpgradeMenu:
         """Manage the selection movement cooldown with a custom timer."""
 
         if not self.can_move:
-            current_time = pygame.time.get_ticks()
+            current_time = game_clock.get_ticks()
             if current_time - self.selection_time >= 300:
                 self.can_move = True
 
@@ -79,12 +82,15 @@ class UpgradeMenu:
             item = Item(left, top, self.width, self.height, item, self.font)
             self.item_list.append(item)
 
-    def display(self):
-        """Display the game menu."""
+    def update(self):
+        """Handle menu input for one simulation step."""
 
         self.get_input()
         self.selection_cooldown()
 
+    def display(self):
+        """Display the game menu."""
+
         for index, item in enumerate(self.item_list):
 
             # get attributes
@@ -112,11 +118,11 @@ class Item:
         color = TEXT_COLOR_SELECTED if selected else TEXT_COLOR
 
         # title
-        title_surf = self.font.render(name, False, color)
+        title_surf = text_cache.render(self.font, name, False, color)
         title_rect = title_surf.get_rect(midtop=self.rect.midtop + pygame.math.Vector2(0, 20))
 
         # cost
-        cost_surf = self.font.render(str(int(cost)), False, color)
+        cost_surf = text_cache.render(self.font, str(int(cost)), False, color)
         cost_rect = cost_surf.get_rect(midbottom=self.rect.midbottom + pygame.math.Vector2(0, -20))
 
         # draw
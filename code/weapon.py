@@ -3,6 +3,23 @@
 
 import pygame
 
+from settings import *
+from support import load_image_cached
+
+
+# every weapon sprite: (weapon, direction) -> surface
+weapon_graphics = {}
+
+
+def load_weapon_graphics():
+    """Load the sprite of every weapon facing every direction, once."""
+
+    for weapon in weapon_data.keys():
+        for direction in ("up", "down", "left", "right"):
+            if (weapon, direction) not in weapon_graphics:
+                full_path = f"../graphics/weapons/{weapon}/{direction}.png"
+                weapon_graphics[(weapon, direction)] = load_image_cached(full_path)
+
 
 class Weapon(pygame.sprite.Sprite):
     """A weapon. (pretty self-explanatory)"""
@@ -10,15 +27,23 @@ class Weapon(pygame.sprite.Sprite):
     def __init__(self, player, groups):
         super().__init__(groups)
 
+        self.sprite_type = "weapon"
+
+        self.setup(player)
+
+    def setup(self, player):
+        """Point the weapon in the player's direction. Lets a single Weapon
+        be reused across attacks.
+        """
+
         direction = player.status.split("_")[0]
         offset_h = pygame.math.Vector2(0,16)
         offset_v = pygame.math.Vector2(-10,0)
 
-        self.sprite_type = "weapon"
-
         # graphic
-        full_path = f"../graphics/weapons/{player.weapon}/{direction}.png"
-        self.image = pygame.image.load(full_path).convert_alpha()
+        if not weapon_graphics:
+            load_weapon_graphics()
+        self.image = weapon_graphics[(player.weapon, direction)]
 
         # placement
         if direction == "right":